@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compare throughput and latency with and without micro-batching.
+
+Usage:
+    python benchmark_batching.py [--requests-per-client N]
+
+Runs 1, 8 and 32 concurrent clients against single-prompt generate() calls
+and against the BatchScheduler. Checks that every batched caller receives the
+output of its own sentence and that concurrent requests were coalesced into
+shared batches.
+"""
+
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.grammar_corrector import GrammarCorrector
+
+SENTENCES = [
+    "This sentence has error.",
+    "Here is another sentence with mistake.",
+    "She go to school every days.",
+    "They was happy about the results.",
+    "I has finished my homework yesterday.",
+    "The informations are not correct.",
+    "He don't like coffee in the morning.",
+    "We was waiting for the bus since an hour.",
+]
+
+def run_load(infer, clients: int, requests_per_client: int):
+    """Fire requests from `clients` concurrent threads; returns per-request latencies and (sentence, output) pairs"""
+    latencies, outputs = [], []
+
+    def client(worker_id: int):
+        for i in range(requests_per_client):
+            sentence = SENTENCES[(worker_id + i) % len(SENTENCES)]
+            start = time.time()
+            output = infer(sentence)
+            latencies.append(time.time() - start)
+            outputs.append((sentence, output))
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.time() - start_time
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return len(latencies) / elapsed, p50, p95, outputs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    args = parser.parse_args()
+
+    print("Initializing GrammarCorrector...")
+    model = GrammarCorrector(batching=True)
+    expected = {sentence: model.infer_batch([sentence])[0] for sentence in SENTENCES}
+
+    modes = {
+        "unbatched": lambda text: model.infer_batch([text])[0],
+        "batched": model.infer,
+    }
+
+    mismatches = []
+    for clients in (1, 8, 32):
+        print(f"\n=== {clients} concurrent client(s) ===")
+        for name, infer in modes.items():
+            throughput, p50, p95, outputs = run_load(infer, clients, args.requests_per_client)
+            print(f"{name:>10}: {throughput:6.2f} req/s   p50 {p50:.3f}s   p95 {p95:.3f}s")
+            mismatches += [(name, sentence, output) for sentence, output in outputs if output != expected[sentence]]
+
+    stats = model.scheduler.stats()
+    print(f"\nScheduler stats: {stats}")
+
+    failed = False
+    if mismatches:
+        print(f"\n{len(mismatches)} output(s) differ from the single-prompt output of the same sentence:")
+        for name, sentence, output in mismatches[:5]:
+            print(f"  {name}: {sentence!r} -> {output!r} (expected {expected[sentence]!r})")
+        failed = True
+    if stats["avg_batch_size"] <= 1:
+        print("\nConcurrent requests were never coalesced into a shared batch")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nEvery caller received its own output; concurrent requests shared batches")
+
+if __name__ == "__main__":
+    main()
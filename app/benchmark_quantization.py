@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark fp32 against dynamic int8 quantisation of the grammar model.
+
+Usage:
+    python benchmark_quantization.py [--model NAME] [--repeats N]
+
+Each variant runs in its own process so resident memory is measured cleanly.
+Reports per-sentence latency, RSS after loading, peak RSS, and how many int8
+corrections agree exactly with fp32 on the reference sentence set. Both
+variants load GRAMMAR_MODEL_NAME (unless --model is given) and decode with the
+service's GRAMMAR_DECODING profile and length-derived max_length.
+"""
+
+import sys
+import os
+import time
+import argparse
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.reference_corpus import REFERENCE_SENTENCES
+from utils import config
+
+def run_variant(model_name: str, quantize: bool, repeats: int, results):
+    from transformers import AutoTokenizer
+    from models.inference_backend import TorchBackend
+    from models.decoding_policy import policy_from_config
+    from utils.memory import rss_bytes, peak_rss_bytes
+
+    policy = policy_from_config()
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    backend = TorchBackend(model_name, quantize=quantize)
+    loaded_rss = rss_bytes()
+
+    outputs, latencies = [], []
+    for _ in range(repeats):
+        outputs = []
+        for sentence in REFERENCE_SENTENCES:
+            start = time.time()
+            inputs = tokenizer([sentence], return_tensors="pt").to(backend.device)
+            ids = backend.generate(inputs, max_length=policy.max_length_for(inputs["input_ids"].shape[1]),
+                                   **policy.base.generation_kwargs)
+            outputs.append(tokenizer.batch_decode(ids, skip_special_tokens=True)[0])
+            latencies.append(time.time() - start)
+
+    results.put({
+        "outputs": outputs,
+        "latencies": sorted(latencies),
+        "loaded_rss": loaded_rss,
+        "peak_rss": peak_rss_bytes(),
+    })
+
+def measure(model_name: str, quantize: bool, repeats: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=run_variant, args=(model_name, quantize, repeats, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def summarise(name: str, result: dict):
+    from utils.memory import to_mb
+    latencies = result["latencies"]
+    mean = sum(latencies) / len(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:>5}: mean {mean * 1000:7.1f} ms   p50 {p50 * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms   "
+          f"RSS {to_mb(result['loaded_rss']):7.1f} MB   peak {to_mb(result['peak_rss']):7.1f} MB")
+    return mean
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=config.GRAMMAR_MODEL_NAME, help="Model to benchmark")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the reference set per variant")
+    args = parser.parse_args()
+
+    print(f"Benchmarking {args.model} on {len(REFERENCE_SENTENCES)} reference sentences x {args.repeats}...\n")
+    fp32 = measure(args.model, quantize=False, repeats=args.repeats)
+    int8 = measure(args.model, quantize=True, repeats=args.repeats)
+
+    fp32_mean = summarise("fp32", fp32)
+    int8_mean = summarise("int8", int8)
+
+    agreement = sum(1 for a, b in zip(fp32["outputs"], int8["outputs"]) if a == b)
+    print(f"\n=== Quantization Summary ===")
+    print(f"Speedup: {fp32_mean / int8_mean:.2f}x")
+    print(f"Memory saved: {(fp32['loaded_rss'] - int8['loaded_rss']) / (1024 * 1024):.1f} MB")
+    print(f"Agreement with fp32: {agreement}/{len(REFERENCE_SENTENCES)} "
+          f"({agreement / len(REFERENCE_SENTENCES):.0%})")
+    for sentence, a, b in zip(REFERENCE_SENTENCES, fp32["outputs"], int8["outputs"]):
+        if a != b:
+            print(f"  ≠ {sentence}\n    fp32: {a}\n    int8: {b}")
+
+if __name__ == "__main__":
+    main()
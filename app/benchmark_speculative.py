@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compare plain greedy decoding with input-copy speculative decoding.
+
+Usage:
+    python benchmark_speculative.py [--model NAME] [--repeats N] [--draft-tokens K] [--ngram N]
+
+Checks that speculative decoding returns exactly the greedy output for every
+reference sentence, and reports per-sentence latency for both plus the number
+of tokens produced per decoder forward pass. The model, draft length, n-gram
+size and the length-derived max_length default to the service's config.
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from transformers import AutoTokenizer
+from models.inference_backend import TorchBackend
+from models.decoding_policy import policy_from_config
+from models.speculative import SpeculativeStats
+from utils.reference_corpus import REFERENCE_SENTENCES
+from utils import config
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=config.GRAMMAR_MODEL_NAME)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--draft-tokens", type=int, default=config.SPECULATIVE_DRAFT_TOKENS)
+    parser.add_argument("--ngram", type=int, default=config.SPECULATIVE_NGRAM_SIZE)
+    args = parser.parse_args()
+
+    policy = policy_from_config("speculative")
+    tokenizer = AutoTokenizer.from_pretrained(args.model, use_fast=False)
+    backend = TorchBackend(args.model)
+
+    greedy_latencies, speculative_latencies = [], []
+    stats = SpeculativeStats()
+    mismatches = []
+
+    for _ in range(args.repeats):
+        for sentence in REFERENCE_SENTENCES:
+            inputs = tokenizer([sentence], return_tensors="pt").to(backend.device)
+            max_length = policy.max_length_for(inputs["input_ids"].shape[1])
+
+            start = time.time()
+            greedy_ids = backend.generate(inputs, max_length=max_length, **policy.base.generation_kwargs)
+            greedy_latencies.append(time.time() - start)
+
+            start = time.time()
+            speculative_ids, sentence_stats = backend.speculative_generate(
+                inputs, max_length=max_length, num_draft_tokens=args.draft_tokens, ngram_size=args.ngram)
+            speculative_latencies.append(time.time() - start)
+            stats.merge(sentence_stats)
+
+            greedy = tokenizer.batch_decode(greedy_ids, skip_special_tokens=True)[0]
+            speculative = tokenizer.batch_decode(speculative_ids, skip_special_tokens=True)[0]
+            if greedy != speculative:
+                mismatches.append((sentence, greedy, speculative))
+
+    greedy_latencies.sort()
+    speculative_latencies.sort()
+    print(f"Sentences: {len(REFERENCE_SENTENCES)} x {args.repeats} repeats")
+    for name, latencies in (("greedy", greedy_latencies), ("speculative", speculative_latencies)):
+        p50 = latencies[len(latencies) // 2]
+        mean = sum(latencies) / len(latencies)
+        print(f"{name:>12}: mean {mean * 1000:7.1f} ms   p50 {p50 * 1000:7.1f} ms")
+
+    speedup = sum(greedy_latencies) / sum(speculative_latencies)
+    print(f"\nSpeedup: {speedup:.2f}x")
+    print(f"Speculative stats: {stats.as_dict()}")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} output(s) differ from greedy decoding:")
+        for sentence, greedy, speculative in mismatches[:5]:
+            print(f"  input:       {sentence}\n  greedy:      {greedy}\n  speculative: {speculative}")
+        sys.exit(1)
+    print("\nAll speculative outputs are identical to greedy decoding")
+
+if __name__ == "__main__":
+    main()
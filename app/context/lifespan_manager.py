@@ -1,19 +1,36 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+from models.registry import registry
+from models.job_runner import job_runner
 from utils.logger import get_logger
-import nltk
+from utils.executors import run_in_inference_pool, shutdown_executors
+from utils import config
+import time
 
 logger = get_logger("lifespan")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
-    logger.info("Starting AI Generation API (lifespan)", service="ai-gen-api", version="1.0.0")
-    try:
-        nltk.download('punkt')
-        logger.info("NLTK punkt tokenizer downloaded successfully")
-    except Exception as e:
-        logger.error("Failed to download NLTK punkt", error=str(e))
+    start_time = time.time()
+    logger.info("Starting AI Generation API (lifespan)", service="ai-gen-api", version="1.0.0",
+                model_loading=config.MODEL_LOADING)
+    if config.MODEL_LOADING == "eager":
+        try:
+            await run_in_inference_pool(registry.prepare)
+        except Exception as e:
+            # Keep serving /health and /ready (which reports the error)
+            logger.error("Model startup failed", error=str(e))
+    elif config.MODEL_LOADING == "background":
+        registry.start_background()
+    # Job workers wait for the models themselves; queued jobs from a previous run resume
+    job_runner.start()
+    logger.info("Server startup completed", startup_time=round(time.time() - start_time, 3))
     yield
     # Shutdown logic
-    logger.info("Shutting down AI Generation API (lifespan)") 
\ No newline at end of file
+    await job_runner.stop()
+    if registry.loaded:
+        for ollama_service in (registry.grammar_corrector.ollama, registry.insights_generator.ollama):
+            await ollama_service.aclose()
+    shutdown_executors()
+    logger.info("Shutting down AI Generation API (lifespan)") 
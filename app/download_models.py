@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Fetch every artifact the service needs, so it can start without network access.
+
+Usage:
+    python download_models.py [--model NAME]
+
+Downloads the grammar model and tokenizer into the Hugging Face cache and the
+NLTK Punkt data into NLTK_DATA_DIR. Run it at image build time; at runtime the
+service only reads local files (unless MODEL_DOWNLOAD_ALLOWED=true).
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import config
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=config.GRAMMAR_MODEL_NAME)
+    args = parser.parse_args()
+
+    start = time.time()
+    from models.registry import ensure_nltk_data
+    ensure_nltk_data(download_allowed=True)
+    print(f"NLTK punkt data ready in {config.NLTK_DATA_DIR} ({time.time() - start:.1f}s)")
+
+    start = time.time()
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    AutoTokenizer.from_pretrained(args.model, use_fast=False)
+    AutoModelForSeq2SeqLM.from_pretrained(args.model)
+    print(f"Model {args.model} cached ({time.time() - start:.1f}s)")
+
+if __name__ == "__main__":
+    main()
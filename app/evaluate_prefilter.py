@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Evaluate the "already correct" pre-filter offline.
+
+Usage:
+    python evaluate_prefilter.py [--file sentences.txt] [--thresholds 0.5,0.7,0.9]
+
+Every sentence is corrected with full generation (the ground truth) and scored
+with the copy-confidence pass. For each threshold the script reports how many
+sentences would skip generation and how many of the skipped ones the model
+would actually have changed (missed corrections). Sentences come from the
+reference corpus unless --file points at a text file with one sentence per line.
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.grammar_corrector import GrammarCorrector
+from utils.reference_corpus import REFERENCE_SENTENCES
+
+DEFAULT_THRESHOLDS = "0.3,0.5,0.6,0.7,0.8,0.9,0.95"
+
+def load_sentences(path):
+    if not path:
+        return REFERENCE_SENTENCES
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="one sentence per line (default: reference corpus)")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    sentences = load_sentences(args.file)
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+
+    print("Initializing GrammarCorrector...")
+    model = GrammarCorrector(batching=False, prefilter_threshold=0.0)
+    if not model.backend.supports_prefilter:
+        sys.exit(f"The {model.backend.name} backend does not support the pre-filter (use GRAMMAR_BACKEND=torch)")
+
+    corrections, scores = [], []
+    generate_time = score_time = 0.0
+    for i in range(0, len(sentences), args.batch_size):
+        batch = sentences[i:i + args.batch_size]
+
+        start = time.time()
+        corrections.extend(model.infer_batch(batch))
+        generate_time += time.time() - start
+
+        start = time.time()
+        inputs = model.tokenizer(batch, return_tensors="pt", padding=True).to(model.device)
+        scores.extend(model.backend.copy_confidence(inputs))
+        score_time += time.time() - start
+
+    needs_correction = [corr.strip() != sent.strip() for sent, corr in zip(sentences, corrections)]
+    total_changed = sum(needs_correction)
+
+    print(f"\nSentences: {len(sentences)} ({total_changed} changed by the model)")
+    print(f"Generation: {generate_time / len(sentences) * 1000:.1f} ms/sentence   "
+          f"copy-confidence pass: {score_time / len(sentences) * 1000:.1f} ms/sentence")
+
+    print(f"\n{'threshold':>9}  {'skip rate':>9}  {'missed':>6}  {'missed rate':>11}  {'est. time':>9}")
+    for threshold in thresholds:
+        skipped = [score >= threshold for score in scores]
+        skip_count = sum(skipped)
+        missed = sum(1 for skip, changed in zip(skipped, needs_correction) if skip and changed)
+        missed_rate = missed / total_changed if total_changed else 0.0
+        # Every sentence pays the scoring pass, only the rest pay generation
+        estimated = score_time + generate_time * (1 - skip_count / len(sentences))
+        print(f"{threshold:>9.2f}  {skip_count / len(sentences):>9.1%}  {missed:>6}  {missed_rate:>11.1%}  "
+              f"{estimated / (generate_time or 1):>8.0%}")
+
+    print("\nest. time is relative to always generating. Missed corrections per threshold:")
+    for threshold in thresholds:
+        missed = [(sent, corr, score) for sent, corr, score, changed
+                  in zip(sentences, corrections, scores, needs_correction) if changed and score >= threshold]
+        for sent, corr, score in missed[:3]:
+            print(f"  {threshold:.2f}  score {score:.3f}: {sent!r} -> {corr!r}")
+
+if __name__ == "__main__":
+    main()
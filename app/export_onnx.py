@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Export the grammar model to ONNX Runtime and verify it against PyTorch.
+
+Usage:
+    python export_onnx.py [--model NAME] [--output PATH] [--skip-export]
+
+The exported model (GRAMMAR_MODEL_NAME unless --model is given, with decoder
+past-key-values) is written to ONNX_MODEL_PATH unless --output is given, then
+both backends correct the reference corpus with the decoding parameters the
+service uses (GRAMMAR_DECODING profile, length-derived max_length) and every
+output must match.
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from transformers import AutoTokenizer
+from models.inference_backend import TorchBackend, OnnxBackend
+from models.decoding_policy import policy_from_config
+from utils.reference_corpus import REFERENCE_SENTENCES
+from utils import config
+
+def export(model_name: str, output: str):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    print(f"Exporting {model_name} to {output}...")
+    start = time.time()
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True)
+    model.save_pretrained(output)
+    AutoTokenizer.from_pretrained(model_name, use_fast=False).save_pretrained(output)
+    print(f"✅ Exported in {time.time() - start:.1f}s")
+
+def correct_all(backend, tokenizer):
+    policy = policy_from_config()
+    outputs = []
+    start = time.time()
+    for sentence in REFERENCE_SENTENCES:
+        inputs = tokenizer([sentence], return_tensors="pt", padding=True).to(backend.device)
+        ids = backend.generate(inputs, max_length=policy.max_length_for(inputs["input_ids"].shape[1]),
+                               **policy.base.generation_kwargs)
+        outputs.append(tokenizer.batch_decode(ids, skip_special_tokens=True)[0])
+    return outputs, time.time() - start
+
+def verify(model_name: str, output: str) -> bool:
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    torch_outputs, torch_time = correct_all(TorchBackend(model_name), tokenizer)
+    onnx_outputs, onnx_time = correct_all(OnnxBackend(model_name, onnx_path=output), tokenizer)
+
+    mismatches = 0
+    for sentence, expected, actual in zip(REFERENCE_SENTENCES, torch_outputs, onnx_outputs):
+        if expected != actual:
+            mismatches += 1
+            print(f"❌ Mismatch for: {sentence}\n   torch: {expected}\n   onnx:  {actual}")
+
+    print(f"\n=== Verification Summary ===")
+    print(f"Sentences: {len(REFERENCE_SENTENCES)}")
+    print(f"Matching outputs: {len(REFERENCE_SENTENCES) - mismatches}/{len(REFERENCE_SENTENCES)}")
+    print(f"PyTorch time: {torch_time:.2f}s")
+    print(f"ONNX Runtime time: {onnx_time:.2f}s")
+    return mismatches == 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=config.GRAMMAR_MODEL_NAME, help="Model to export")
+    parser.add_argument("--output", default=config.ONNX_MODEL_PATH, help="Directory for the exported model")
+    parser.add_argument("--skip-export", action="store_true", help="Only verify an existing export")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export(args.model, args.output)
+    sys.exit(0 if verify(args.model, args.output) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from routes.inference import router
+from routes.jobs import router as jobs_router
 from context.lifespan_manager import lifespan
+from models.registry import registry
+from utils.segmentation import segmentation_scope
+from fastapi.responses import JSONResponse
 import time
 import uuid
 from utils.logger import get_logger
@@ -27,6 +31,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -43,8 +48,9 @@ async def log_requests(request: Request, call_next):
                user_agent=request.headers.get("user-agent"))
     
     try:
-        # Process request
-        response = await call_next(request)
+        # Process request (sentence segmentation is memoized for its duration)
+        with segmentation_scope():
+            response = await call_next(request)
         
         # Calculate processing time
         process_time = time.time() - start_time
@@ -74,6 +80,12 @@ async def health_check():
     logger.debug("Health check requested")
     return {"status": "healthy", "service": "t5-grammar-api"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once models are loaded and warmed up, 503 before"""
+    status = registry.status()
+    return JSONResponse(status_code=200 if registry.ready else 503, content=status)
+
 if __name__ == '__main__':
     import uvicorn
     logger.info("Starting server with uvicorn", host="0.0.0.0", port=8000)
@@ -0,0 +1,138 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, List, Optional
+from utils.logger import get_logger
+import threading
+import time
+
+
+class _PendingRequest:
+    __slots__ = ("key", "prompt", "future", "enqueued_at")
+
+    def __init__(self, key: Hashable, prompt: str):
+        self.key = key
+        self.prompt = prompt
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching in front of a batched inference function.
+
+    Requests are held for up to ``window_ms`` (or until ``max_batch_size`` are
+    waiting) and then passed to ``batch_fn`` as one list. Only requests with the
+    same ``key`` (the generation parameters) are batched together. Each caller
+    receives the output at its own position through a Future.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[str], Any], List[str]],
+                 max_batch_size: int = 16, window_ms: float = 10.0,
+                 name: str = "batch_scheduler"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self.logger = get_logger(name)
+
+        self._pending: List[_PendingRequest] = []
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.batches_run = 0
+        self.items_processed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a batch slot"""
+        with self._cond:
+            return len(self._pending)
+
+    def _ensure_worker(self):
+        # Started lazily so the scheduler can be built before a fork
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="grammar-batcher", daemon=True)
+            self._worker.start()
+
+    def submit(self, prompt: str, key: Hashable = None) -> Future:
+        """Queue a prompt and return a Future resolving to its output"""
+        request = _PendingRequest(key, prompt)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchScheduler is closed")
+            self._ensure_worker()
+            self._pending.append(request)
+            self._cond.notify()
+        return request.future
+
+    def infer(self, prompt: str, key: Hashable = None, timeout: Optional[float] = None) -> str:
+        """Blocking helper: submit a prompt and wait for its output"""
+        return self.submit(prompt, key).result(timeout=timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "avg_batch_size": round(self.items_processed / self.batches_run, 2) if self.batches_run else 0.0,
+            "queue_depth": self.queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000.0,
+        }
+
+    def _next_batch(self) -> Optional[List[_PendingRequest]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            # Wait for the window of the oldest request to elapse or the batch to fill up
+            deadline = self._pending[0].enqueued_at + self.window
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            key = self._pending[0].key
+            batch, rest = [], []
+            for request in self._pending:
+                if request.key == key and len(batch) < self.max_batch_size:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self._pending = rest
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start_time = time.time()
+            queue_wait = time.monotonic() - batch[0].enqueued_at
+            try:
+                outputs = self.batch_fn([request.prompt for request in batch], batch[0].key)
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(outputs)} outputs for {len(batch)} inputs")
+                for request, output in zip(batch, outputs):
+                    request.future.set_result(output)
+            except Exception as e:
+                self.logger.error("Batched inference failed", error=str(e), batch_size=len(batch))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+            self.batches_run += 1
+            self.items_processed += len(batch)
+            self.logger.debug("Batch processed",
+                              batch_size=len(batch),
+                              queue_wait=round(queue_wait, 4),
+                              batch_time=round(time.time() - start_time, 3))
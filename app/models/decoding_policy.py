@@ -0,0 +1,145 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from utils.logger import get_logger
+from utils import config
+import math
+import threading
+import time
+
+
+class DecodingProfile:
+    """A named set of generate() parameters"""
+
+    def __init__(self, name: str, generation_kwargs: dict):
+        self.name = name
+        self.generation_kwargs = generation_kwargs
+
+    @property
+    def num_beams(self) -> int:
+        return self.generation_kwargs.get("num_beams", 1)
+
+
+class DecodingPolicy:
+    """
+    Picks decoding parameters from the input length and the current load.
+
+    ``max_length`` follows the input token count (with headroom for edits),
+    rounded up to a bucket so concurrent requests still share batches. When
+    more than ``max_in_flight`` generations are queued or running, or the p95
+    of generation latencies over the last ``latency_horizon_seconds`` passes
+    ``p95_threshold_seconds``, requests use the cheaper ``degraded`` profile
+    instead of timing out.
+    """
+
+    def __init__(self, base: DecodingProfile, degraded: DecodingProfile,
+                 max_in_flight: int = 8, p95_threshold_seconds: float = 2.0,
+                 latency_window: int = 200, latency_horizon_seconds: float = 60.0,
+                 enabled: bool = True,
+                 length_ratio: float = 1.3, length_margin: int = 8,
+                 length_bucket: int = 32, max_length_cap: int = 512):
+        self.base = base
+        self.degraded = degraded
+        self.profiles: Dict[str, DecodingProfile] = {base.name: base, degraded.name: degraded}
+        self.max_in_flight = max_in_flight
+        self.p95_threshold = p95_threshold_seconds
+        self.latency_horizon = latency_horizon_seconds
+        self.enabled = enabled
+        self.length_ratio = length_ratio
+        self.length_margin = length_margin
+        self.length_bucket = max(1, length_bucket)
+        self.max_length_cap = max_length_cap
+        self.logger = get_logger("decoding_policy")
+
+        self._latencies = deque(maxlen=max(1, latency_window))
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.selected = {base.name: 0, degraded.name: 0}
+
+    def max_length_for(self, input_tokens: int) -> int:
+        """Output length limit for an input of ``input_tokens`` tokens"""
+        wanted = input_tokens * self.length_ratio + self.length_margin
+        bucketed = math.ceil(wanted / self.length_bucket) * self.length_bucket
+        return int(min(self.max_length_cap, max(self.length_bucket, bucketed)))
+
+    def p95_latency(self) -> float:
+        # Old samples expire so a quiet period after a spike restores the base profile
+        cutoff = time.monotonic() - self.latency_horizon
+        with self._lock:
+            latencies = sorted(latency for finished_at, latency in self._latencies if finished_at >= cutoff)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def select(self) -> Tuple[DecodingProfile, Optional[str]]:
+        """Return the profile to use now and why it was degraded (None when it wasn't)"""
+        reason = None
+        if self.enabled and self.degraded is not self.base:
+            if self.in_flight >= self.max_in_flight:
+                reason = "queue_depth"
+            elif self.p95_threshold > 0 and self.p95_latency() > self.p95_threshold:
+                reason = "p95_latency"
+
+        profile = self.degraded if reason else self.base
+        with self._lock:
+            self.selected[profile.name] += 1
+        if reason:
+            self.logger.debug("Degrading decoding profile", profile=profile.name, reason=reason,
+                              in_flight=self.in_flight)
+        return profile, reason
+
+    @contextmanager
+    def track(self):
+        """Count a generation as in flight and record its latency (queue wait included)"""
+        with self._lock:
+            self.in_flight += 1
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            finished_at = time.monotonic()
+            with self._lock:
+                self.in_flight -= 1
+                self._latencies.append((finished_at, finished_at - start_time))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "base_profile": self.base.name,
+            "degraded_profile": self.degraded.name,
+            "in_flight": self.in_flight,
+            "p95_latency": round(self.p95_latency(), 3),
+            "max_in_flight": self.max_in_flight,
+            "p95_threshold_seconds": self.p95_threshold,
+            "selected": dict(self.selected),
+        }
+
+
+def profile_for(decoding: str) -> DecodingProfile:
+    """The generate() parameters of a GRAMMAR_DECODING strategy ("beam", "greedy" or "speculative")"""
+    # Speculative decoding produces exactly the greedy output, so both share cache entries
+    if decoding == "beam":
+        return DecodingProfile("beam", {"num_beams": 2, "early_stopping": True})
+    return DecodingProfile(decoding, {"num_beams": 1})
+
+
+def policy_from_config(decoding: Optional[str] = None) -> DecodingPolicy:
+    """
+    The policy the service runs with: the configured profile (``decoding``
+    defaults to GRAMMAR_DECODING) and the DECODING_* / GRAMMAR_MAX_LENGTH_* limits.
+    Scripts that export or benchmark the model use it too, so they decode like production.
+    """
+    base = profile_for(decoding or config.GRAMMAR_DECODING)
+    # Under load beam search drops to greedy; greedy and speculative have nothing cheaper
+    degraded = profile_for("greedy") if base.name == "beam" else base
+    return DecodingPolicy(
+        base, degraded,
+        max_in_flight=config.DECODING_DEGRADE_IN_FLIGHT,
+        p95_threshold_seconds=config.DECODING_DEGRADE_P95_SECONDS,
+        latency_window=config.DECODING_LATENCY_WINDOW,
+        latency_horizon_seconds=config.DECODING_LATENCY_HORIZON_SECONDS,
+        enabled=config.ADAPTIVE_DECODING_ENABLED,
+        length_ratio=config.GRAMMAR_MAX_LENGTH_RATIO,
+        length_margin=config.GRAMMAR_MAX_LENGTH_MARGIN,
+        max_length_cap=config.GRAMMAR_MAX_LENGTH_CAP
+    )
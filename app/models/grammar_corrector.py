@@ -1,118 +1,502 @@
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
-import torch
-from utils.diff import diff_original_with_corrected
-from utils.split import split_into_sentences
+from transformers import AutoTokenizer
+from utils.diff import DIFF_VERSION, diff_original_with_corrected, map_offset, project_onto_spans, shift_onto_paragraph
+from utils.chunking import pack_batches, plan_chunks
+from utils.segmentation import SentenceSpan, sentence_spans, split_into_sentences
 from models.ollama_service import OllamaService
+from models.batch_scheduler import BatchScheduler
+from models.inference_backend import create_backend
+from models.speculative import SpeculativeStats
+from models.decoding_policy import DecodingProfile, policy_from_config
 from utils.logger import get_logger
-from typing import Optional
+from utils.cache import LRUCache, content_hash
+from utils.persistent_cache import get_persistent_cache
+from utils.executors import run_in_inference_pool
+from utils import config
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import threading
 import time
 import json
 
 
 class GrammarCorrector:
-    def __init__(self, model_name="deep-learning-analytics/GrammarCorrector"):
+    def __init__(self, model_name: Optional[str] = None,
+                 batching: Optional[bool] = None, backend: Optional[str] = None,
+                 quantize: Optional[bool] = None, decoding: Optional[str] = None,
+                 prefilter_threshold: Optional[float] = None):
         start_time = time.time()
         self.logger = get_logger("grammar_corrector")
+        model_name = model_name or config.GRAMMAR_MODEL_NAME
+        # Never reach out to the Hub at startup unless explicitly allowed
+        local_files_only = not config.MODEL_DOWNLOAD_ALLOWED
         
         self.logger.info("Initializing GrammarCorrector", model_name=model_name)
         
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False, local_files_only=local_files_only)
+        self.backend = create_backend(backend or config.GRAMMAR_BACKEND, model_name,
+                                      onnx_path=config.ONNX_MODEL_PATH,
+                                      quantize=config.GRAMMAR_QUANTIZE if quantize is None else quantize,
+                                      local_files_only=local_files_only)
+        self.model = self.backend.model
+        self.device = self.backend.device
         self.ollama = OllamaService()
+
+        self.decoding = decoding or config.GRAMMAR_DECODING
+        if self.decoding == "speculative" and not self.backend.supports_speculative:
+            self.logger.warning("Speculative decoding not supported by backend, using greedy",
+                          backend=self.backend.name)
+            self.decoding = "greedy"
+        self.policy = policy_from_config(self.decoding)
+        self.generation_kwargs = self.policy.base.generation_kwargs
+        self.speculative_stats = SpeculativeStats()
+        self._stats_lock = threading.Lock()
+
+        # Inputs the model is confident it would copy unchanged skip generate() entirely
+        self.prefilter_threshold = (config.GRAMMAR_PREFILTER_THRESHOLD
+                                    if prefilter_threshold is None else prefilter_threshold)
+        if self.prefilter_threshold > 0 and not self.backend.supports_prefilter:
+            self.logger.warning("Pre-filter not supported by backend, disabling it",
+                          backend=self.backend.name)
+            self.prefilter_threshold = 0.0
+        self.prefilter_checked = 0
+        self.prefilter_skipped = 0
+
+        # Concurrent infer() calls are coalesced into padded generate() batches
+        batching = config.GRAMMAR_BATCHING_ENABLED if batching is None else batching
+        self.scheduler = BatchScheduler(
+            self._run_batch,
+            max_batch_size=config.GRAMMAR_BATCH_MAX_SIZE,
+            window_ms=config.GRAMMAR_BATCH_WINDOW_MS,
+            name="grammar_batch_scheduler"
+        ) if batching else None
+
+        # Sentence corrections (and their diffs) keyed by content hash, so
+        # re-submitted documents only send new or edited sentences to the model
+        self.sentence_cache = LRUCache(
+            max_entries=config.SENTENCE_CACHE_SIZE,
+            ttl_seconds=config.SENTENCE_CACHE_TTL_SECONDS
+        )
+        # Second tier shared by all worker processes and surviving restarts
+        self.persistent_cache = get_persistent_cache()
         
         init_time = time.time() - start_time
         self.logger.info("GrammarCorrector initialized successfully",
                    model_name=model_name,
                    device=str(self.device),
+                   backend=self.backend.name,
+                   decoding=self.decoding,
+                   prefilter_threshold=self.prefilter_threshold,
+                   batching=batching,
                    init_time=round(init_time, 3))
 
-    def infer(self, prompt, max_length=128):
+    def infer_batch(self, prompts: List[str], max_length: Optional[int] = None,
+                    profile: Optional[DecodingProfile] = None) -> List[str]:
+        """
+        Correct several prompts with a single padded generate() call.
+
+        ``max_length`` defaults to a limit derived from the longest prompt and
+        ``profile`` to the configured (non-degraded) decoding profile.
+        """
         start_time = time.time()
+        profile = profile or self.policy.base
         
         self.logger.debug("Starting grammar inference",
-                    prompt_length=len(prompt),
+                    batch_size=len(prompts),
                     max_length=max_length,
+                    profile=profile.name,
                     device=str(self.device))
         
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-            outputs = self.model.generate(
-                **inputs,
-                max_length=max_length, 
-                num_beams=2, 
-                early_stopping=True
-            )
-
-            result = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            results = list(prompts)
+            to_generate = list(range(len(prompts)))
+            if self.prefilter_threshold > 0:
+                to_generate = self._prefilter(prompts)
+
+            if to_generate:
+                batch = [prompts[i] for i in to_generate]
+                inputs = self.tokenizer(batch, return_tensors="pt", padding=True).to(self.device)
+                if max_length is None:
+                    max_length = self.policy.max_length_for(inputs["input_ids"].shape[1])
+                if profile.name == "speculative":
+                    outputs, spec_stats = self.backend.speculative_generate(
+                        inputs,
+                        max_length=max_length,
+                        num_draft_tokens=config.SPECULATIVE_DRAFT_TOKENS,
+                        ngram_size=config.SPECULATIVE_NGRAM_SIZE
+                    )
+                    with self._stats_lock:
+                        self.speculative_stats.merge(spec_stats)
+                else:
+                    outputs = self.backend.generate(
+                        inputs,
+                        max_length=max_length,
+                        **profile.generation_kwargs
+                    )
+
+                for i, output in zip(to_generate, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                    results[i] = output
             
             inference_time = time.time() - start_time
             self.logger.info("Grammar inference completed",
-                       prompt_length=len(prompt),
-                       result_length=len(result),
+                       batch_size=len(prompts),
+                       generated=len(to_generate),
+                       max_length=max_length,
+                       profile=profile.name,
+                       prompt_length=sum(len(p) for p in prompts),
+                       result_length=sum(len(r) for r in results),
                        inference_time=round(inference_time, 3))
             
-            return result
+            return results
             
         except Exception as e:
             inference_time = time.time() - start_time
             self.logger.error("Grammar inference failed",
                         error=str(e),
+                        batch_size=len(prompts),
                         inference_time=round(inference_time, 3))
             raise
 
-    def analyse(self, original: str, include_explanations: bool = False):
+    def _prefilter(self, prompts: List[str]) -> List[int]:
+        """Indices of the prompts that still need generate() after the copy-confidence check"""
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+        scores = self.backend.copy_confidence(inputs)
+        to_generate = [i for i, score in enumerate(scores) if score < self.prefilter_threshold]
+        with self._stats_lock:
+            self.prefilter_checked += len(prompts)
+            self.prefilter_skipped += len(prompts) - len(to_generate)
+        return to_generate
+
+    def _run_batch(self, prompts: List[str], key: tuple) -> List[str]:
+        profile_name, max_length = key
+        return self.infer_batch(prompts, max_length=max_length, profile=self.policy.profiles[profile_name])
+
+    def infer(self, prompt, max_length: Optional[int] = None, profile: Optional[DecodingProfile] = None):
+        """Correct a single prompt, sharing a generate() batch with concurrent callers when batching is on"""
+        profile = profile or self.policy.base
+        with self.policy.track():
+            if self.scheduler is not None:
+                return self.scheduler.infer(prompt, key=(profile.name, max_length))
+            return self.infer_batch([prompt], max_length=max_length, profile=profile)[0]
+
+    def _token_counts(self, texts: List[str]) -> List[int]:
+        return [len(ids) for ids in self.tokenizer(texts)["input_ids"]]
+
+    def _generate_packed(self, texts: List[str], token_counts: List[int], max_lengths: List[int],
+                         profile: DecodingProfile):
         """
-        Analyse text with grammar correction.
+        Correct ``texts`` in generate() calls packed by pack_batches, so no
+        call pads past GRAMMAR_CHUNK_BATCH_TOKENS or holds more than
+        GRAMMAR_BATCH_MAX_SIZE inputs. Texts are only batched with others of
+        the same max_length, so each is generated with exactly the limit in
+        its cache key. Returns the outputs in input order and the number of
+        calls.
+        """
+        by_max_length = {}
+        for i, max_length in enumerate(max_lengths):
+            by_max_length.setdefault(max_length, []).append(i)
 
-        Args:
-            original: Text to analyze (for grammar correction)
-            include_explanations: Whether to generate Ollama explanations (default: False for performance)
+        outputs = [None] * len(texts)
+        generate_calls = 0
+        for max_length, indices in sorted(by_max_length.items()):
+            for batch in pack_batches([token_counts[i] for i in indices],
+                                      config.GRAMMAR_CHUNK_BATCH_TOKENS, config.GRAMMAR_BATCH_MAX_SIZE):
+                batch = [indices[j] for j in batch]
+                with self.policy.track():
+                    generated = self.infer_batch([texts[i] for i in batch], max_length=max_length, profile=profile)
+                for i, output in zip(batch, generated):
+                    outputs[i] = output
+                generate_calls += 1
+        return outputs, generate_calls
+
+    def _sentence_cache_key(self, sentence: str, max_length: int,
+                            profile: Optional[DecodingProfile] = None) -> str:
+        params = sorted((profile or self.policy.base).generation_kwargs.items())
+        return content_hash("correction", self.model_name, self.backend.name, max_length, params,
+                            self.prefilter_threshold, DIFF_VERSION, sentence)
+
+    def _lookup_sentence(self, key: str):
+        entry = self.sentence_cache.get(key)
+        if entry is None and self.persistent_cache is not None:
+            stored = self.persistent_cache.get(key)
+            if stored is not None:
+                entry = (stored[0], stored[1])
+                self.sentence_cache.set(key, entry)
+        return entry
+
+    def _store_sentence(self, key: str, entry: tuple):
+        self.sentence_cache.set(key, entry)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(key, list(entry))
+
+    def _sentence_keys(self, original_sentences: List[str], profile: DecodingProfile):
+        """Per-sentence cache key, max_length and token count (each sentence gets its own limit, so keys don't depend on its neighbours)"""
+        token_counts = self._token_counts(original_sentences)
+        max_lengths = [self.policy.max_length_for(count) for count in token_counts]
+        keys = [self._sentence_cache_key(sentence, max_length, profile)
+                for sentence, max_length in zip(original_sentences, max_lengths)]
+        return keys, max_lengths, token_counts
+
+    def _correct_by_sentence(self, original: str, profile: Optional[DecodingProfile] = None,
+                             prepared: Optional[dict] = None):
+        """
+        Split first and correct the uncached sentences in packed generate() calls.
+
+        Returns the reassembled paragraph together with the aligned original
+        sentence spans, corrected sentences and per-sentence diffs (all the same
+        length), and the largest max_length used. Entries found in ``prepared``
+        (see _prepare_documents) are used before the caches.
+        """
+        profile = profile or self.policy.base
+        original_spans = sentence_spans(original)
+        if not original_spans:
+            return original, [], [], [], 0
+        original_sentences = [span.text for span in original_spans]
+
+        keys, max_lengths, token_counts = self._sentence_keys(original_sentences, profile)
+        prepared = prepared or {}
+        cached = [prepared.get(key) or self._lookup_sentence(key) for key in keys]
+
+        # Only new or edited sentences reach the model (duplicates within the text run once)
+        pending = {}
+        for i, (key, entry) in enumerate(zip(keys, cached)):
+            if entry is None:
+                pending.setdefault(key, i)
+        if pending:
+            indices = list(pending.values())
+            outputs, _ = self._generate_packed([original_sentences[i] for i in indices],
+                                               [token_counts[i] for i in indices],
+                                               [max_lengths[i] for i in indices], profile)
+            for (key, i), corr_sent in zip(list(pending.items()), outputs):
+                entry = (corr_sent, diff_original_with_corrected(original_sentences[i], corr_sent))
+                self._store_sentence(key, entry)
+                pending[key] = entry
+
+        corrected_sentences, sentence_diffs = [], []
+        for key, entry in zip(keys, cached):
+            corr_sent, diffs = entry if entry is not None else pending[key]
+            corrected_sentences.append(corr_sent)
+            sentence_diffs.append(diffs)
+
+        self.logger.debug("Sentence cache lookup",
+                    sentence_count=len(original_sentences),
+                    inferred=len(pending),
+                    cache_hits=sum(1 for entry in cached if entry is not None))
+
+        corrected = self._reassemble(original, original_spans, corrected_sentences)
+        return corrected, original_spans, corrected_sentences, sentence_diffs, max(max_lengths)
+
+    def _correct_long(self, original: str, profile: DecodingProfile):
+        """
+        Paragraph-mode correction for texts over GRAMMAR_CHUNK_MAX_TOKENS.
+
+        Sentences are grouped into token-budgeted chunks (see plan_chunks).
+        Chunks found in the correction caches are reused; the rest are packed
+        into generate() calls of bounded padded size. The calls run one after
+        another on the inference worker already handling the document, and
+        skip the batch scheduler (whose batches are sized by count, not
+        tokens), so memory use does not grow with the document. When chunks
+        carry overlap context, the part of the output that corrects the
+        context is cut off. Each chunk's correction replaces exactly the
+        sentences it owns. Returns the corrected text, the paragraph diffs
+        and the largest max_length used.
+        """
+        spans = sentence_spans(original)
+        chunks = plan_chunks(self._token_counts([span.text for span in spans]),
+                             config.GRAMMAR_CHUNK_MAX_TOKENS, config.GRAMMAR_CHUNK_OVERLAP_SENTENCES)
+
+        owned_spans = [SentenceSpan(spans[chunk.start].start, spans[chunk.end - 1].end,
+                                    original[spans[chunk.start].start:spans[chunk.end - 1].end])
+                       for chunk in chunks]
+        texts = [original[spans[chunk.first].start:span.end] for chunk, span in zip(chunks, owned_spans)]
+        context_lengths = [span.start - spans[chunk.first].start for chunk, span in zip(chunks, owned_spans)]
+        max_lengths = [self.policy.max_length_for(chunk.tokens) for chunk in chunks]
+        # The context is part of the key: it changes the output and where it is cut
+        keys = [content_hash("chunk", self._sentence_cache_key(text, max_length, profile), context_length)
+                for text, max_length, context_length in zip(texts, max_lengths, context_lengths)]
+        entries = [self._lookup_sentence(key) for key in keys]
+
+        # Identical chunks within the document run once
+        pending = {}
+        for i, (key, entry) in enumerate(zip(keys, entries)):
+            if entry is None:
+                pending.setdefault(key, i)
+        pending_chunks = list(pending.values())
+        outputs, generate_calls = self._generate_packed([texts[i] for i in pending_chunks],
+                                                        [chunks[i].tokens for i in pending_chunks],
+                                                        [max_lengths[i] for i in pending_chunks], profile)
+        for i, output in zip(pending_chunks, outputs):
+            if context_lengths[i]:
+                output = output[map_offset(texts[i], output, context_lengths[i]):].lstrip()
+            entry = (output, diff_original_with_corrected(owned_spans[i].text, output))
+            self._store_sentence(keys[i], entry)
+            pending[keys[i]] = entry
+
+        self.logger.info("Long document corrected in chunks",
+                   sentence_count=len(spans),
+                   chunk_count=len(chunks),
+                   inferred=len(pending_chunks),
+                   generate_calls=generate_calls,
+                   max_length=max(max_lengths))
+
+        entries = [entry if entry is not None else pending[key] for key, entry in zip(keys, entries)]
+        corrected = self._reassemble(original, owned_spans, [correction for correction, _ in entries])
+        diffs = shift_onto_paragraph([chunk_diffs for _, chunk_diffs in entries], owned_spans)
+        return corrected, diffs, max(max_lengths)
+
+    @staticmethod
+    def _reassemble(original: str, original_spans: List[SentenceSpan], corrected_sentences: List[str]) -> str:
+        """Swap each original sentence for its correction, keeping the whitespace between them"""
+        parts = []
+        cursor = 0
+        for span, corr_sent in zip(original_spans, corrected_sentences):
+            parts.append(original[cursor:span.start])
+            parts.append(corr_sent)
+            cursor = span.end
+        parts.append(original[cursor:])
+        return "".join(parts)
+
+    @staticmethod
+    def _explanation_text(raw) -> str:
+        """Normalise an explanation result (parsed JSON dict or raw text) into the message shown to users"""
+        if isinstance(raw, dict):
+            if "error" in raw:
+                return "Explanation unavailable at the moment."
+            return str(raw.get("message", raw))
+        try:
+            explanation_json = json.loads(raw)
+            return explanation_json.get("message", raw)
+        except Exception:
+            return str(raw).strip()
+
+    def _prepare_documents(self, originals: List[str], modes: List[str], profile: DecodingProfile) -> dict:
+        """
+        Correct everything several documents need in shared generate() calls.
+
+        Uncached sentences (sentence mode) and whole texts (paragraph mode) of
+        all documents are deduplicated and generated in shared packed calls
+        (see _generate_packed).
+        Returns sentence cache entries by key and paragraph corrections by
+        ("paragraph", text), for _analyse_core(prepared=...).
+        """
+        prepared = {}
+        pending = {}  # key -> (text, token count, max_length)
+        for original, mode in zip(originals, modes):
+            if mode == "sentence":
+                sentences = [span.text for span in sentence_spans(original)]
+                if not sentences:
+                    continue
+                keys, max_lengths, token_counts = self._sentence_keys(sentences, profile)
+                for key, sentence, max_length, token_count in zip(keys, sentences, max_lengths, token_counts):
+                    if key in prepared or key in pending:
+                        continue
+                    entry = self._lookup_sentence(key)
+                    if entry is not None:
+                        prepared[key] = entry
+                    else:
+                        pending[key] = (sentence, token_count, max_length)
+            else:
+                key = ("paragraph", original)
+                token_count = self._token_counts([original])[0]
+                # Long documents are chunked by _analyse_core instead
+                if key not in pending and token_count <= config.GRAMMAR_CHUNK_MAX_TOKENS:
+                    pending[key] = (original, token_count, self.policy.max_length_for(token_count))
+
+        items = list(pending.items())
+        outputs, generate_calls = self._generate_packed([text for _, (text, _, _) in items],
+                                                        [count for _, (_, count, _) in items],
+                                                        [max_length for _, (_, _, max_length) in items], profile)
+        for (key, (text, _, _)), corr in zip(items, outputs):
+            if isinstance(key, tuple):
+                prepared[key] = corr
+            else:
+                entry = (corr, diff_original_with_corrected(text, corr))
+                self._store_sentence(key, entry)
+                prepared[key] = entry
+
+        self.logger.debug("Documents prepared",
+                    document_count=len(originals),
+                    inferred=len(pending),
+                    generate_calls=generate_calls)
+        return prepared
+
+    def _analyse_core(self, original: str, include_explanations: bool, mode: Optional[str],
+                      prepared: Optional[dict] = None, selection: Optional[tuple] = None):
+        """
+        Correction, diffing and sentence alignment (everything except the Ollama calls).
+
+        ``prepared`` and ``selection`` (the (profile, reason) pair it was
+        prepared with) come from _prepare_documents() for bulk requests.
+        Returns the response dict plus the sentence entries that still need an explanation.
         """
         start_time = time.time()
+        mode = mode or config.GRAMMAR_CORRECTION_MODE
 
         self.logger.info("Starting grammar analysis",
                    original_length=len(original),
-                   include_explanations=include_explanations)
+                   include_explanations=include_explanations,
+                   mode=mode)
 
-        corrected = self.infer(original)
-        paragraph_diffs = diff_original_with_corrected(original, corrected)
+        profile, degraded_reason = selection or self.policy.select()
+        if mode == "sentence":
+            corrected, original_spans, corrected_sentences, cached_diffs, max_length = \
+                self._correct_by_sentence(original, profile, prepared)
+        else:
+            original_spans, cached_diffs, paragraph_diffs = None, None, None
+            token_count = self._token_counts([original])[0]
+            if token_count > config.GRAMMAR_CHUNK_MAX_TOKENS:
+                corrected, paragraph_diffs, max_length = self._correct_long(original, profile)
+            else:
+                max_length = self.policy.max_length_for(token_count)
+                corrected = (prepared or {}).get(("paragraph", original))
+                if corrected is None:
+                    corrected = self.infer(original, max_length=max_length, profile=profile)
+
+        # One diff per document: in sentence mode the paragraph diff is the cached sentence
+        # diffs shifted into place, otherwise sentence diffs are slices of the paragraph diff
+        # (chunked long documents are diffed chunk by chunk)
+        if cached_diffs is not None:
+            paragraph_diffs = shift_onto_paragraph(cached_diffs, original_spans)
+        elif paragraph_diffs is None:
+            paragraph_diffs = diff_original_with_corrected(original, corrected)
         grammar_time = time.time() - start_time
         self.logger.info("Grammar analysis completed",
                    grammar_time=round(grammar_time, 3),
                    diff_count=len(paragraph_diffs))
 
-        # Split both paragraphs into sentences
-        original_sentences = split_into_sentences(original)
-        corrected_sentences = split_into_sentences(corrected)
+        # Split both paragraphs into sentences (already aligned in sentence mode)
+        if original_spans is None:
+            original_spans = sentence_spans(original)
+            corrected_sentences = split_into_sentences(corrected)
+        original_sentences = [span.text for span in original_spans]
+        if cached_diffs is None:
+            cached_diffs = project_onto_spans(paragraph_diffs, original_spans)
 
         self.logger.debug("Sentence analysis",
                     original_sentences=len(original_sentences),
                     corrected_sentences=len(corrected_sentences))
 
         sentences_analysis = []
+        to_explain = []
         for i, (orig_sent, corr_sent) in enumerate(zip(original_sentences, corrected_sentences)):
-            sentence_diffs = diff_original_with_corrected(orig_sent, corr_sent)
+            sentence_diffs = cached_diffs[i]
             explanation = None
-            if include_explanations and sentence_diffs:
-                self.logger.debug(f"Generating explanation for sentence {i+1}/{len(original_sentences)}")
-                raw_explanation = self.ollama.generate_correction_explanation(orig_sent, corr_sent, sentence_diffs)
-                try:
-                    explanation_json = json.loads(raw_explanation)
-                    explanation = explanation_json.get("message", raw_explanation)
-                except Exception:
-                    explanation = raw_explanation.strip()
-            elif not include_explanations:
+            if not include_explanations:
                 explanation = "Explanations disabled for performance"
-            else:
+            elif not sentence_diffs:
                 explanation = "No corrections needed. Your text looks good!"
-            sentences_analysis.append({
+            sentence = {
                 "sentenceIndex": i,
+                "startIndex": original_spans[i].start,
+                "endIndex": original_spans[i].end,
                 "original": orig_sent,
                 "corrected": corr_sent,
                 "changes": sentence_diffs,
                 "explanation": explanation
-            })
+            }
+            if include_explanations and sentence_diffs:
+                to_explain.append(sentence)
+            sentences_analysis.append(sentence)
 
         # Handle edge cases for sentence count differences
         if len(corrected_sentences) > len(original_sentences):
@@ -134,21 +518,270 @@ class GrammarCorrector:
             for i in range(len(corrected_sentences), len(original_sentences)):
                 sentences_analysis.append({
                     "sentenceIndex": i,
+                    "startIndex": original_spans[i].start,
+                    "endIndex": original_spans[i].end,
                     "original": original_sentences[i],
                     "corrected": "",
-                    "changes": [],
+                    "changes": cached_diffs[i],
                     "explanation": "Sentence removed."
                 })
 
-        total_time = time.time() - start_time
-        self.logger.info("Grammar analysis completed",
-                   total_time=round(total_time, 3),
-                   sentence_count=len(sentences_analysis))
-
         response = {
             "original": original,
             "corrected": corrected,
             "paragraphDiffs": paragraph_diffs,
-            "sentences": sentences_analysis
+            "sentences": sentences_analysis,
+            "decodingProfile": {
+                "name": profile.name,
+                "numBeams": profile.num_beams,
+                "maxLength": max_length,
+                "degraded": degraded_reason is not None,
+                "reason": degraded_reason
+            }
+        }
+        return response, to_explain
+
+    @staticmethod
+    def _batch_request(sentences: List[dict]) -> List[dict]:
+        return [{"sentenceIndex": s["sentenceIndex"], "original": s["original"], "corrected": s["corrected"]}
+                for s in sentences]
+
+    def _explain(self, to_explain: List[dict]):
+        """Fill in explanations, either batched into few Ollama calls or one call per sentence"""
+        if not to_explain:
+            return
+        remaining = to_explain
+        if config.EXPLANATION_MODE == "batch":
+            explanations = self.ollama.generate_batch_explanations(self._batch_request(to_explain))
+            remaining = self._apply_batch_explanations(to_explain, explanations)
+
+        for n, sentence in enumerate(remaining):
+            self.logger.debug(f"Generating explanation for sentence {n+1}/{len(remaining)}")
+            raw_explanation = self.ollama.generate_correction_explanation(
+                sentence["original"], sentence["corrected"], sentence["changes"])
+            sentence["explanation"] = self._explanation_text(raw_explanation)
+
+    async def _aexplain_iter(self, to_explain: List[dict]):
+        """Fill in explanations asynchronously, yielding each sentence as soon as its explanation is ready"""
+        if not to_explain:
+            return
+        remaining = to_explain
+        if config.EXPLANATION_MODE == "batch":
+            explanations = await self.ollama.agenerate_batch_explanations(self._batch_request(to_explain))
+            remaining = self._apply_batch_explanations(to_explain, explanations)
+            for sentence in to_explain:
+                if sentence["explanation"] is not None:
+                    yield sentence
+
+        if remaining:
+            self.logger.debug("Generating explanations concurrently", explanation_count=len(remaining))
+
+            async def explain(sentence: dict) -> dict:
+                raw_explanation = await self.ollama.agenerate_correction_explanation(
+                    sentence["original"], sentence["corrected"], sentence["changes"])
+                sentence["explanation"] = self._explanation_text(raw_explanation)
+                return sentence
+
+            tasks = [asyncio.ensure_future(explain(sentence)) for sentence in remaining]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                # The consumer stopped early (client gone, generator closed): no more Ollama calls
+                for task in tasks:
+                    task.cancel()
+
+    async def _aexplain(self, to_explain: List[dict]):
+        """Async _explain(): batches, or per-sentence calls, are issued concurrently"""
+        async for _ in self._aexplain_iter(to_explain):
+            pass
+
+    def _apply_batch_explanations(self, to_explain: List[dict], explanations: dict) -> List[dict]:
+        """Copy batched messages onto their sentences; returns the ones the model left out"""
+        missing = []
+        for sentence in to_explain:
+            message = explanations.get(sentence["sentenceIndex"])
+            if message:
+                sentence["explanation"] = message
+            else:
+                missing.append(sentence)
+        if missing:
+            self.logger.warning("Batched explanations incomplete, falling back to per-sentence calls",
+                          requested=len(to_explain),
+                          missing=len(missing))
+        return missing
+
+    def analyse(self, original: str, include_explanations: bool = False, mode: Optional[str] = None):
+        """
+        Analyse text with grammar correction.
+
+        Args:
+            original: Text to analyze (for grammar correction)
+            include_explanations: Whether to generate Ollama explanations (default: False for performance)
+            mode: "paragraph" (single generate over the whole text) or "sentence"
+                  (split first, batch-correct uncached sentences); defaults to GRAMMAR_CORRECTION_MODE
+        """
+        start_time = time.time()
+        response, to_explain = self._analyse_core(original, include_explanations, mode)
+
+        self._explain(to_explain)
+
+        total_time = time.time() - start_time
+        self.logger.info("Grammar analysis completed",
+                   total_time=round(total_time, 3),
+                   sentence_count=len(response["sentences"]))
+        return response
+
+    async def aanalyse(self, original: str, include_explanations: bool = False, mode: Optional[str] = None,
+                       on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None):
+        """
+        Async variant of analyse() for the API.
+
+        The model work runs on the inference pool; explanations for all changed
+        sentences are then issued concurrently through the async Ollama client
+        (packed into batched prompts when EXPLANATION_MODE is "batch").
+        ``on_progress(explained, total)`` is awaited once the correction is
+        done and after every explanation.
+        """
+        start_time = time.time()
+        response, to_explain = await run_in_inference_pool(
+            self._analyse_core, original, include_explanations, mode)
+
+        if on_progress is None:
+            await self._aexplain(to_explain)
+        else:
+            await on_progress(0, len(to_explain))
+            explained = 0
+            async for _ in self._aexplain_iter(to_explain):
+                explained += 1
+                await on_progress(explained, len(to_explain))
+
+        total_time = time.time() - start_time
+        self.logger.info("Grammar analysis completed",
+                   total_time=round(total_time, 3),
+                   sentence_count=len(response["sentences"]),
+                   explanation_count=len(to_explain))
+        return response
+
+    async def astream_analyse(self, original: str, include_explanations: bool = False, mode: Optional[str] = None):
+        """
+        Streaming variant of aanalyse().
+
+        Yields a "correction" frame with the paragraph-level result, then one
+        "sentence" frame per SentenceAnalysis as soon as its explanation is
+        done, and a closing "summary" frame.
+        """
+        start_time = time.time()
+        response, to_explain = await run_in_inference_pool(
+            self._analyse_core, original, include_explanations, mode)
+
+        yield {
+            "type": "correction",
+            "original": response["original"],
+            "corrected": response["corrected"],
+            "paragraphDiffs": response["paragraphDiffs"],
+            "decodingProfile": response["decodingProfile"],
+            "firstFrameTime": round(time.time() - start_time, 3)
+        }
+
+        # Sentences without pending explanations are ready right away
+        pending = {id(sentence) for sentence in to_explain}
+        for sentence in response["sentences"]:
+            if id(sentence) not in pending:
+                yield {"type": "sentence", **sentence}
+
+        async for sentence in self._aexplain_iter(to_explain):
+            yield {"type": "sentence", **sentence}
+
+        total_time = time.time() - start_time
+        self.logger.info("Streaming grammar analysis completed",
+                   total_time=round(total_time, 3),
+                   sentence_count=len(response["sentences"]),
+                   explanation_count=len(to_explain))
+        yield {
+            "type": "summary",
+            "sentenceCount": len(response["sentences"]),
+            "explanationCount": len(to_explain),
+            "processTime": round(total_time, 3)
+        }
+
+    def _analyse_documents(self, originals: List[str], include_explanations: List[bool], modes: List[str]):
+        """_analyse_core() for several documents whose model work is shared (see _prepare_documents)"""
+        selection = self.policy.select()
+        prepared = self._prepare_documents(originals, modes, selection[0])
+        return [self._analyse_core(original, explain, mode, prepared=prepared, selection=selection)
+                for original, explain, mode in zip(originals, include_explanations, modes)]
+
+    def _plan_chunks(self, originals: List[str]) -> List[List[int]]:
+        """Group consecutive documents until each group holds about GRAMMAR_BULK_CHUNK_SENTENCES sentences"""
+        chunks, current, sentence_count = [], [], 0
+        for i, original in enumerate(originals):
+            current.append(i)
+            sentence_count += max(1, len(sentence_spans(original)))
+            if sentence_count >= config.GRAMMAR_BULK_CHUNK_SENTENCES:
+                chunks.append(current)
+                current, sentence_count = [], 0
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def aanalyse_many(self, originals: List[str], include_explanations: List[bool],
+                            modes: List[Optional[str]],
+                            admit: Optional[Callable[[], Awaitable[Callable[[], None]]]] = None):
+        """
+        Bulk variant of aanalyse(): yields (index, response) in input order.
+
+        Documents are processed in chunks of about GRAMMAR_BULK_CHUNK_SENTENCES
+        sentences; within a chunk all model work shares generate() calls. The
+        next chunk is corrected on the inference pool while the current one
+        waits for its explanations, and each chunk is yielded as soon as it is
+        done. ``admit``, when given, is awaited before each chunk's correction
+        and returns the function that frees the slot once it is done.
+        """
+        modes = [mode or config.GRAMMAR_CORRECTION_MODE for mode in modes]
+        chunks = await run_in_inference_pool(self._plan_chunks, originals)
+
+        async def run(chunk: List[int]):
+            release = await admit() if admit is not None else None
+            try:
+                return await run_in_inference_pool(
+                    self._analyse_documents,
+                    [originals[i] for i in chunk],
+                    [include_explanations[i] for i in chunk],
+                    [modes[i] for i in chunk])
+            finally:
+                if release is not None:
+                    release()
+
+        def correct(chunk: List[int]):
+            return asyncio.ensure_future(run(chunk))
+
+        next_task = correct(chunks[0]) if chunks else None
+        try:
+            for n, chunk in enumerate(chunks):
+                results = await next_task
+                next_task = correct(chunks[n + 1]) if n + 1 < len(chunks) else None
+                await asyncio.gather(*(self._aexplain(to_explain) for _, to_explain in results))
+                for i, (response, _) in zip(chunk, results):
+                    yield i, response
+        finally:
+            if next_task is not None:
+                next_task.cancel()
+
+    def stats(self) -> dict:
+        """Counters for the stats endpoint"""
+        return {
+            "backend": self.backend.describe(),
+            "decoding": self.decoding,
+            "decoding_policy": self.policy.stats(),
+            "speculative": self.speculative_stats.as_dict() if self.decoding == "speculative" else None,
+            "prefilter": {
+                "threshold": self.prefilter_threshold,
+                "checked": self.prefilter_checked,
+                "skipped": self.prefilter_skipped,
+                "skip_rate": round(self.prefilter_skipped / self.prefilter_checked, 4) if self.prefilter_checked else 0.0,
+            },
+            "sentence_cache": self.sentence_cache.stats(),
+            "persistent_cache": self.persistent_cache.stats() if self.persistent_cache is not None else None,
+            "batch_scheduler": self.scheduler.stats() if self.scheduler is not None else None,
         }
-        return response
\ No newline at end of file
@@ -0,0 +1,144 @@
+from transformers import AutoModelForSeq2SeqLM
+from models.speculative import SpeculativeStats, copy_speculative_generate
+from utils.logger import get_logger
+from pathlib import Path
+from typing import List, Optional, Tuple
+import abc
+import torch
+
+logger = get_logger("inference_backend")
+
+
+class InferenceBackend(abc.ABC):
+    """
+    Runs generate() for the grammar model.
+
+    GrammarCorrector only talks to this interface, so the execution engine can
+    be swapped by config without touching tokenisation, caching or batching.
+    Optional capabilities are advertised by the ``supports_*`` flags.
+    """
+    name = "base"
+    supports_speculative = False
+    supports_prefilter = False
+
+    def __init__(self):
+        self.model = None
+        self.device = torch.device("cpu")
+
+    @abc.abstractmethod
+    def generate(self, inputs: dict, **generation_kwargs) -> torch.Tensor:
+        """Generate output token ids for an already tokenised batch"""
+
+    def speculative_generate(self, inputs: dict, max_length: int, num_draft_tokens: int,
+                             ngram_size: int) -> Tuple[List[List[int]], SpeculativeStats]:
+        """Greedy-equivalent decoding with drafts copied from the input (see models/speculative.py)"""
+        raise NotImplementedError(f"{self.name} backend does not support speculative decoding")
+
+    def copy_confidence(self, inputs: dict) -> List[float]:
+        """Score how confidently the model would reproduce each input unchanged (see TorchBackend)"""
+        raise NotImplementedError(f"{self.name} backend does not support the copy-confidence pre-filter")
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "device": str(self.device)}
+
+
+class TorchBackend(InferenceBackend):
+    """
+    Eager PyTorch model (CUDA when available).
+
+    With ``quantize=True`` the Linear layers are dynamically quantised to int8
+    and the model is pinned to CPU, trading a little accuracy for faster and
+    smaller matmuls on CPU-only nodes.
+    """
+    name = "torch"
+    supports_speculative = True
+    supports_prefilter = True
+
+    def __init__(self, model_name: str, device: Optional[torch.device] = None, quantize: bool = False,
+                 local_files_only: bool = False):
+        super().__init__()
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, local_files_only=local_files_only)
+        model.eval()
+        if quantize:
+            self.device = torch.device("cpu")
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.name = "torch-int8"
+            logger.info("Applied dynamic int8 quantization", model_name=model_name)
+        else:
+            self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = model.to(self.device)
+
+    def generate(self, inputs: dict, **generation_kwargs) -> torch.Tensor:
+        with torch.inference_mode():
+            return self.model.generate(**inputs, **generation_kwargs)
+
+    def copy_confidence(self, inputs: dict) -> List[float]:
+        """
+        Score how confidently the model would reproduce each input unchanged.
+
+        One teacher-forced forward pass with the source as the target: the score
+        is the lowest probability the model gives to any source token, so a
+        single token it wants to change is enough to pull it down.
+        """
+        input_ids, attention_mask = inputs["input_ids"], inputs["attention_mask"]
+        start = torch.full_like(input_ids[:, :1], self.model.config.decoder_start_token_id)
+        decoder_input_ids = torch.cat([start, input_ids[:, :-1]], dim=1)
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask,
+                                decoder_input_ids=decoder_input_ids).logits
+            token_probs = logits.float().softmax(-1).gather(-1, input_ids.unsqueeze(-1)).squeeze(-1)
+            token_probs = token_probs.masked_fill(attention_mask == 0, 1.0)
+            return token_probs.min(dim=1).values.tolist()
+
+    def speculative_generate(self, inputs: dict, max_length: int, num_draft_tokens: int,
+                             ngram_size: int) -> Tuple[List[List[int]], SpeculativeStats]:
+        # Speculation is per sequence: each row is decoded on its own, without padding
+        sequences, stats = [], SpeculativeStats()
+        for row_ids, row_mask in zip(inputs["input_ids"], inputs["attention_mask"]):
+            input_ids = row_ids[row_mask.bool()].unsqueeze(0)
+            output_ids, row_stats = copy_speculative_generate(
+                self.model, input_ids, torch.ones_like(input_ids),
+                max_length=max_length, num_draft_tokens=num_draft_tokens, ngram_size=ngram_size)
+            sequences.append(output_ids)
+            stats.merge(row_stats)
+        return sequences, stats
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime export of the model with cached decoder past-key-values.
+
+    Loads a previously exported model from ``onnx_path`` (see export_onnx.py),
+    or exports on the fly when the directory doesn't exist yet. Requires the
+    optional ``optimum[onnxruntime]`` package.
+    """
+    name = "onnx"
+
+    def __init__(self, model_name: str, onnx_path: Optional[str] = None, local_files_only: bool = False):
+        super().__init__()
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("The ONNX backend requires 'optimum[onnxruntime]' to be installed") from e
+
+        if onnx_path and Path(onnx_path).exists():
+            logger.info("Loading exported ONNX model", onnx_path=onnx_path)
+            self.model = ORTModelForSeq2SeqLM.from_pretrained(onnx_path, use_cache=True)
+        else:
+            logger.warning("No exported ONNX model found, exporting on the fly", model_name=model_name,
+                           onnx_path=onnx_path)
+            self.model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True,
+                                                              local_files_only=local_files_only)
+
+    def generate(self, inputs: dict, **generation_kwargs) -> torch.Tensor:
+        return self.model.generate(**inputs, **generation_kwargs)
+
+
+def create_backend(name: str, model_name: str, onnx_path: Optional[str] = None,
+                   quantize: bool = False, local_files_only: bool = False) -> InferenceBackend:
+    """Build the backend selected by GRAMMAR_BACKEND (quantize applies to torch only)"""
+    if name == "torch":
+        return TorchBackend(model_name, quantize=quantize, local_files_only=local_files_only)
+    if name == "onnx":
+        return OnnxBackend(model_name, onnx_path=onnx_path, local_files_only=local_files_only)
+    raise ValueError(f"Unknown grammar backend '{name}' (expected 'torch' or 'onnx')")
@@ -1,26 +1,101 @@
 from typing import Optional, List, Any
 from models.ollama_service import OllamaService
 from utils.logger import get_logger
+from utils.cache import LRUCache, content_hash
+from utils import config
+from schemas.prompt import Insight
+from pydantic import ValidationError
 import json
 
+
+def _insights_size(insights: List[Insight]) -> int:
+    """Approximate memory footprint of a cached insights list"""
+    return sum(len(insight.model_dump_json()) for insight in insights) + 64
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join(text.split()) if text else ""
+
+
 class InsightsGenerator:
     def __init__(self):
         self.ollama = OllamaService()
         self.logger = get_logger("insights_generator")
+        # Finished results keyed on the analysed content, model and options
+        self.cache = LRUCache(
+            max_entries=config.INSIGHTS_CACHE_SIZE,
+            ttl_seconds=config.INSIGHTS_CACHE_TTL_SECONDS,
+            max_bytes=config.INSIGHTS_CACHE_MAX_BYTES,
+            size_fn=_insights_size
+        )
+
+    def _cache_key(self, text: str, full_context: Optional[str]) -> str:
+        options = json.dumps(self.ollama.INSIGHTS_OPTIONS, sort_keys=True)
+        return content_hash("insights", self.ollama.model_name, options,
+                            _normalize(text), _normalize(full_context))
 
     def generate(self, text: str, full_context: Optional[str] = None):
         """
-        Generate insights using OllamaService and parse the response as JSON.
+        Generate insights using OllamaService's schema-constrained output.
         Args:
             text: The main text to analyze.
             full_context: Optional broader context for insights analysis.
         Returns:
-            List of insights (as required by the endpoint).
+            List of validated Insight objects (as required by the endpoint).
         Raises:
-            Exception if insights cannot be generated or parsed.
+            StructuredOutputError if no valid insights were produced after retries.
         """
+        cache_key = self._cache_key(text, full_context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Insights served from cache", insights_length=len(cached))
+            return list(cached)
+
         try:
-            return self.ollama.generate_content_insights(text, full_context)        
+            insights = self.ollama.generate_content_insights(text, full_context)
+            self.cache.set(cache_key, list(insights))
+            return insights
         except Exception as e:
             self.logger.error("Failed to generate insights", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+    async def astream(self, text: str, full_context: Optional[str] = None, check: bool = True):
+        """
+        Stream validated insights as Ollama produces them.
+        Args:
+            text: The main text to analyze.
+            full_context: Optional broader context for insights analysis.
+            check: Whether to run the content threshold check first.
+        Yields:
+            Insight objects; malformed ones are logged and skipped.
+        """
+        cache_key = self._cache_key(text, full_context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("Streamed insights served from cache", insights_length=len(cached))
+            for insight in cached:
+                yield insight
+            return
+
+        insights = []
+        invalid = 0
+        parse_stats = {}
+        async for obj in self.ollama.astream_content_insights(text, full_context, check=check,
+                                                              parse_stats=parse_stats):
+            try:
+                insight = Insight.model_validate(obj)
+            except ValidationError as e:
+                invalid += 1
+                self.logger.warning("Skipping invalid streamed insight", error=str(e))
+                continue
+            insights.append(insight)
+            yield insight
+
+        # Shares its key with generate(), so only a cleanly finished stream is cached
+        if insights and not invalid and not parse_stats.get("skipped", 1):
+            self.cache.set(cache_key, insights)
+        elif insights:
+            self.logger.info("Incomplete streamed insights not cached",
+                       insights_length=len(insights),
+                       invalid=invalid,
+                       unparsed=parse_stats.get("skipped"))
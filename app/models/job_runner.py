@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+from models.registry import registry
+from schemas.prompt import InsightsResponse
+from utils.job_store import JobStore, get_job_store
+from utils.segmentation import segmentation_scope
+from utils.executors import run_in_inference_pool, run_in_ollama_pool
+from utils.logger import get_logger
+from utils import config
+import asyncio
+import time
+
+logger = get_logger("job_runner")
+
+
+class JobRunner:
+    """
+    In-process worker pool for the job API.
+
+    JOB_WORKERS asyncio workers claim jobs from the JobStore one at a time, so
+    at most that many jobs per process are in flight and a burst of
+    submissions queues up instead of timing out. Workers wait for the models
+    to be ready before claiming anything. Every JOB_MAINTENANCE_SECONDS the
+    runner renews the lease on its running jobs, requeues jobs whose lease has
+    not been renewed for JOB_LEASE_SECONDS (their process died or hung) and
+    purges finished jobs older than JOB_RETENTION_SECONDS. Jobs interrupted by
+    a clean shutdown go straight back to the queue.
+    """
+
+    def __init__(self):
+        self.workers = config.JOB_WORKERS
+        self.poll_seconds = config.JOB_POLL_SECONDS
+        self.store: Optional[JobStore] = None
+        self.succeeded = 0
+        self.failed = 0
+
+        self._handlers = {"grammar": self._grammar, "insights": self._insights}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Dict[str, float] = {}
+
+    def start(self):
+        """Start the workers on the running event loop (no-op when the job API is disabled)"""
+        self.store = get_job_store()
+        if self.store is None or self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{n}") for n in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain(), name="job-maintenance"))
+        logger.info("Job runner started", workers=self.workers, path=self.store.path)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job runner stopped")
+
+    def notify(self):
+        """Wake idle workers after a submission instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _models_ready(self) -> bool:
+        if not registry.ready and config.MODEL_LOADING == "lazy":
+            try:
+                await run_in_inference_pool(registry.prepare)
+            except Exception:
+                pass  # Reported by /ready; retried on the next poll
+        return registry.ready
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim) if await self._models_ready() else None
+            except Exception as e:
+                logger.error("Job claim failed", error=str(e))
+                job = None
+            if job is None:
+                await self._sleep(self.poll_seconds)
+                continue
+            await self._run(job)
+
+    async def _maintain(self):
+        while True:
+            try:
+                running = list(self._running)
+                held = await asyncio.to_thread(self.store.heartbeat, running)
+                if held < len(running):
+                    logger.warning("Lost the lease on running jobs", running=len(running), held=held)
+                await asyncio.to_thread(self.store.recover, config.JOB_MAX_ATTEMPTS, config.JOB_LEASE_SECONDS)
+                purged = await asyncio.to_thread(self.store.purge, config.JOB_RETENTION_SECONDS)
+                if purged:
+                    logger.info("Purged finished jobs", purged=purged)
+            except Exception as e:
+                logger.error("Job maintenance failed", error=str(e))
+            await asyncio.sleep(config.JOB_MAINTENANCE_SECONDS)
+
+    async def _run(self, job: dict):
+        start_time = time.time()
+        job_id = job["id"]
+        self._running[job_id] = start_time
+        logger.info("Job started", job_id=job_id, kind=job["kind"], attempt=job["attempts"],
+                    queue_wait=round(start_time - job["created_at"], 3))
+        try:
+            # Jobs run outside any HTTP request, so they open their own segmentation memo
+            with segmentation_scope():
+                result = await self._handlers[job["kind"]](job)
+            await asyncio.to_thread(self.store.succeed, job_id, result, {"stage": "done"})
+            self.succeeded += 1
+            logger.info("Job completed", job_id=job_id, kind=job["kind"],
+                        process_time=round(time.time() - start_time, 3))
+        except asyncio.CancelledError:
+            self.store.requeue(job_id)
+            logger.info("Job requeued on shutdown", job_id=job_id, kind=job["kind"])
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.fail, job_id, str(e))
+            self.failed += 1
+            logger.error("Job failed", job_id=job_id, kind=job["kind"], error=str(e),
+                         process_time=round(time.time() - start_time, 3))
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _set_progress(self, job_id: str, progress: dict):
+        await asyncio.to_thread(self.store.set_progress, job_id, progress)
+
+    async def _grammar(self, job: dict) -> dict:
+        payload = job["payload"]
+        await self._set_progress(job["id"], {"stage": "correcting"})
+
+        async def on_progress(explained: int, total: int):
+            await self._set_progress(job["id"], {"stage": "explaining", "completed": explained, "total": total})
+
+        return await registry.grammar_corrector.aanalyse(
+            original=payload["text"],
+            include_explanations=payload.get("include_explanations") or False,
+            mode=payload.get("correction_mode"),
+            on_progress=on_progress
+        )
+
+    async def _insights(self, job: dict) -> dict:
+        payload = job["payload"]
+        await self._set_progress(job["id"], {"stage": "generating"})
+        insights = await run_in_ollama_pool(
+            registry.insights_generator.generate, payload["text"], payload.get("full_context"))
+        return InsightsResponse(insights=insights).model_dump()
+
+    async def stats(self) -> dict:
+        """Runner counters plus the store's; the store is queried off the event loop"""
+        now = time.time()
+        running = {job_id: round(now - started, 3) for job_id, started in self._running.items()}
+        return {
+            "workers": self.workers if self._tasks else 0,
+            "running": running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "store": await asyncio.to_thread(self.store.stats) if self.store is not None else None,
+        }
+
+
+job_runner = JobRunner()
@@ -1,7 +1,16 @@
 import json
 from typing import List, Dict, Any, Optional
-from utils.split import split_into_sentences
+from utils.segmentation import sentence_spans
 from utils.logger import get_logger
+from utils.cache import content_hash
+from utils.persistent_cache import get_persistent_cache
+from utils.json_stream import IncrementalJSONObjectParser, loads_lenient
+from utils import config
+from schemas.prompt import BatchExplanations, CorrectionExplanation, InsightsResponse
+from pydantic import BaseModel, ValidationError
+import asyncio
+import threading
+import httpx
 import ollama
 import time
 import re
@@ -13,6 +22,14 @@ class InsufficientContentError(Exception):
         self.min_words = min_words
         super().__init__(f"Need at least {min_sentences} sentences and {min_words} words for insights analysis")
 
+class StructuredOutputError(Exception):
+    """Raised when the model's reply can't be validated against the requested schema after all retries"""
+    def __init__(self, schema_name: str, attempts: int, last_error: Optional[str]):
+        self.schema_name = schema_name
+        self.attempts = attempts
+        self.last_error = last_error
+        super().__init__(f"Could not get valid {schema_name} output after {attempts} attempt(s): {last_error}")
+
 class OllamaService:
     def __init__(self, model_name: str = "llama3.2:latest", 
                  min_sentences: int = 3, min_words: int = 50):
@@ -20,6 +37,18 @@ class OllamaService:
         self.min_sentences = min_sentences
         self.min_words = min_words
         self.logger = get_logger("ollama_service")
+        self.cache = get_persistent_cache()
+
+        # Async client and concurrency limit are bound to the event loop that first uses them
+        self._async_client: Optional[ollama.AsyncClient] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Structured-output counters (see structured_output_stats)
+        self._structured = {"calls": 0, "attempts": 0, "parse_failures": 0,
+                            "repaired": 0, "retries": 0, "exhausted": 0, "cache_hits": 0}
+        # Updated from the Ollama pool threads and the event loop alike
+        self._structured_lock = threading.Lock()
         
         self.logger.info("OllamaService initialized", 
                    model_name=model_name,
@@ -28,7 +57,7 @@ class OllamaService:
         
     def _meets_threshold(self, text: str) -> bool:
         """Check if text meets minimum requirements for insights analysis"""
-        sentences = split_into_sentences(text)
+        sentences = sentence_spans(text)
         word_count = len(text.split())
         
         meets_threshold = len(sentences) >= self.min_sentences and word_count >= self.min_words
@@ -41,91 +70,275 @@ class OllamaService:
         
         return meets_threshold
         
-    def generate(self, prompt: str, system: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> dict:
-        """Generate text using Ollama Python package (using generate, not chat)"""
+    def _cache_key(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return content_hash("ollama", self.model_name, json.dumps(options or {}, sort_keys=True), system, prompt)
+
+    def _generate_params(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]],
+                         format: Optional[Dict[str, Any]] = None) -> dict:
+        # Prepare the generate call parameters
+        generate_params = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False
+        }
+        if system:
+            generate_params["system"] = system
+        if format:
+            generate_params["format"] = format
+        
+        # Add options if provided
+        if options:
+            generate_params["options"] = options
+        return generate_params
+
+    def _generate_raw(self, prompt: str, system: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+                      format: Optional[Dict[str, Any]] = None) -> str:
+        """Blocking Ollama call returning the raw reply text"""
         start_time = time.time()
+        self.logger.debug("Starting Ollama generation (generate)",
+                    model_name=self.model_name,
+                    prompt_length=len(prompt),
+                    has_system=system is not None,
+                    has_options=options is not None,
+                    has_format=format is not None)
+        
+        # Use ollama.generate instead of ollama.chat
+        response = ollama.generate(**self._generate_params(prompt, system, options, format))
+        
+        generation_time = time.time() - start_time
+        response_text = response["response"] if "response" in response else ""
         
+        self.logger.info("Ollama generation completed",
+                   model_name=self.model_name,
+                   generation_time=round(generation_time, 3),
+                   response_length=len(response_text))
+        return response_text
+
+    def _get_async_client(self):
+        """Pooled keep-alive client plus semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            limits = httpx.Limits(max_connections=config.OLLAMA_MAX_CONCURRENCY,
+                                  max_keepalive_connections=config.OLLAMA_MAX_CONCURRENCY)
+            self._async_client = ollama.AsyncClient(host=config.OLLAMA_HOST,
+                                                    timeout=config.OLLAMA_TIMEOUT_SECONDS,
+                                                    limits=limits)
+            self._async_semaphore = asyncio.Semaphore(config.OLLAMA_MAX_CONCURRENCY)
+            self._async_loop = loop
+            self.logger.info("Async Ollama client created",
+                       host=config.OLLAMA_HOST,
+                       max_concurrency=config.OLLAMA_MAX_CONCURRENCY)
+        return self._async_client, self._async_semaphore
+
+    async def _agenerate_raw(self, prompt: str, system: Optional[str] = None,
+                             options: Optional[Dict[str, Any]] = None,
+                             format: Optional[Dict[str, Any]] = None) -> str:
+        """Pooled async Ollama call returning the raw reply text"""
+        start_time = time.time()
+        client, semaphore = self._get_async_client()
+        async with semaphore:
+            response = await client.generate(**self._generate_params(prompt, system, options, format))
+
+        generation_time = time.time() - start_time
+        response_text = response["response"] if "response" in response else ""
+        self.logger.info("Ollama generation completed",
+                   model_name=self.model_name,
+                   generation_time=round(generation_time, 3),
+                   response_length=len(response_text))
+        return response_text
+
+    async def aclose(self):
+        """Close the pooled async client"""
+        client = self._async_client
+        self._async_client = None
+        self._async_loop = None
+        close = getattr(client, "close", None)
+        if close is not None:
+            await close()
+    
+    def _structured_cache_key(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]],
+                              response_model: type) -> Optional[str]:
+        return self._cache_key(prompt, system, {"options": options or {}, "schema": response_model.__name__})
+
+    def _validate_structured(self, raw: str, response_model: type) -> Optional[BaseModel]:
+        """Validate a reply with pydantic's JSON parser; on failure try once more on the extracted, repaired JSON"""
+        try:
+            return response_model.model_validate_json(raw)
+        except ValidationError as e:
+            self._count("parse_failures")
+            first_error = str(e)
+
+        json_match = re.search(r'(\{.*\}|\[.*\])', raw, re.DOTALL)
+        if json_match:
+            try:
+                data = loads_lenient(json_match.group(0))
+                # A bare list is accepted for single-field wrappers such as InsightsResponse
+                if isinstance(data, list) and len(response_model.model_fields) == 1:
+                    data = {next(iter(response_model.model_fields)): data}
+                result = response_model.model_validate(data)
+                self._count("repaired")
+                return result
+            except (json.JSONDecodeError, ValidationError):
+                pass
+
+        self.logger.warning("Structured output did not match schema",
+                      schema=response_model.__name__,
+                      error=first_error[:500],
+                      raw_response=raw[:500])
+        return None
+
+    def _structured_attempt_prompt(self, prompt: str, attempt: int) -> str:
+        if attempt == 0:
+            return prompt
+        return prompt + "\nYour previous reply was not valid. Reply with JSON only, matching the required schema exactly.\n"
+
+    def _structured_format(self, response_model: type) -> Optional[Dict[str, Any]]:
+        return response_model.model_json_schema() if config.STRUCTURED_OUTPUT_ENABLED else None
+
+    def _count(self, *names: str):
+        with self._structured_lock:
+            for name in names:
+                self._structured[name] += 1
+
+    def _structured_call(self, prompt: str, response_model: type, system: Optional[str],
+                         options: Optional[Dict[str, Any]], cache: bool):
+        """
+        Cache lookup, retry, validate and repair loop shared by generate_structured() and agenerate_structured().
+
+        A generator: it yields the prompt for each attempt and is sent back the
+        raw reply (or the exception the Ollama call raised). It returns the
+        validated model, or raises StructuredOutputError once all attempts fail.
+        """
+        self._count("calls")
+        cache_key = self._structured_cache_key(prompt, system, options, response_model) if cache else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._count("cache_hits")
+                return response_model.model_validate(cached)
+
+        attempts = 1 + max(0, config.STRUCTURED_OUTPUT_MAX_RETRIES)
+        last_error = None
+        for attempt in range(attempts):
+            self._count("attempts")
+            if attempt:
+                self._count("retries")
+            reply = yield self._structured_attempt_prompt(prompt, attempt)
+            if isinstance(reply, Exception):
+                last_error = str(reply)
+                self.logger.error("Ollama generation failed", model_name=self.model_name, error=last_error)
+                continue
+            result = self._validate_structured(reply, response_model)
+            if result is not None:
+                if cache_key is not None:
+                    self.cache.set(cache_key, result.model_dump())
+                return result
+            last_error = "reply did not match schema"
+
+        self._count("exhausted")
+        raise StructuredOutputError(response_model.__name__, attempts, last_error)
+
+    def generate_structured(self, prompt: str, response_model: type, system: Optional[str] = None,
+                            options: Optional[Dict[str, Any]] = None, cache: bool = False) -> BaseModel:
+        """
+        Generate output constrained to ``response_model``'s JSON schema.
+
+        The schema is passed to Ollama's ``format`` parameter and the reply is
+        validated with pydantic. Replies that fail validation are repaired once
+        and otherwise retried up to STRUCTURED_OUTPUT_MAX_RETRIES times.
+        Raises StructuredOutputError when no usable output was produced.
+        """
+        call = self._structured_call(prompt, response_model, system, options, cache)
+        format = self._structured_format(response_model)
         try:
-            self.logger.debug("Starting Ollama generation (generate)",
-                        model_name=self.model_name,
-                        prompt_length=len(prompt),
-                        has_system=system is not None,
-                        has_options=options is not None)
-            
-            # Prepare the generate call parameters
-            generate_params = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            # Add options if provided
-            if options:
-                generate_params["options"] = options
-            
-            # Use ollama.generate instead of ollama.chat
-            response = ollama.generate(**generate_params)
-            
-            generation_time = time.time() - start_time
-            response_text = response["response"] if "response" in response else ""
-            response_length = len(response_text)
-            
-            self.logger.info("Ollama generation completed",
-                       model_name=self.model_name,
-                       generation_time=round(generation_time, 3),
-                       response_length=response_length)
-            
-            response_text = response_text.replace("\n", "")
-            json_match = re.search(r'(\{.*\}|\[.*\])', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
+            attempt_prompt = next(call)
+            while True:
                 try:
-                    parsed = json.loads(json_str)
-                    return parsed
-                except json.JSONDecodeError as e:
-                    self.logger.error("Failed to parse Ollama response as JSON", error=str(e), raw_response=json_str)
-                    return {"error": "Invalid JSON format", "raw": response_text}
-            else:
-                self.logger.error("No JSON found in Ollama response", raw_response=response_text)
-                return {"error": "No JSON found in response", "raw": response_text}
-
-        except Exception as e:
-            generation_time = time.time() - start_time
-            self.logger.error("Ollama generation failed",
-                        model_name=self.model_name,
-                        error=str(e),
-                        generation_time=round(generation_time, 3))
-            return {"error": "Ollama generation failed", "raw": str(e)}
-    
-    def generate_batch_explanations(self, corrections_batch: List[str]):
-        """Generate explanations for multiple corrections in one call using the provided system prompt."""
-        if not corrections_batch:
-            return "No corrections to explain."
-        
+                    reply = self._generate_raw(attempt_prompt, system, options, format)
+                except Exception as e:
+                    reply = e
+                attempt_prompt = call.send(reply)
+        except StopIteration as done:
+            return done.value
+
+    async def agenerate_structured(self, prompt: str, response_model: type, system: Optional[str] = None,
+                                   options: Optional[Dict[str, Any]] = None, cache: bool = False) -> BaseModel:
+        """Async variant of generate_structured() using the pooled client"""
+        call = self._structured_call(prompt, response_model, system, options, cache)
+        format = self._structured_format(response_model)
+        try:
+            attempt_prompt = next(call)
+            while True:
+                try:
+                    reply = await self._agenerate_raw(attempt_prompt, system, options, format)
+                except Exception as e:
+                    reply = e
+                attempt_prompt = call.send(reply)
+        except StopIteration as done:
+            return done.value
+
+    def structured_output_stats(self) -> dict:
+        with self._structured_lock:
+            stats = dict(self._structured)
+        attempts = stats["attempts"]
+        stats["parse_failure_rate"] = round(stats["parse_failures"] / attempts, 4) if attempts else 0.0
+        stats["unusable_rate"] = round(stats["exhausted"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Rough llama-style estimate; only used to keep batch prompts inside a budget
+        return len(text) // 4 + 1
+
+    def _pack_explanation_batches(self, corrections: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group corrections into batches whose user block stays within EXPLANATION_BATCH_TOKEN_BUDGET"""
+        batches, current, used = [], [], 0
+        for correction in corrections:
+            cost = self._estimate_tokens(correction["original"]) + self._estimate_tokens(correction["corrected"]) + 12
+            if current and used + cost > config.EXPLANATION_BATCH_TOKEN_BUDGET:
+                batches.append(current)
+                current, used = [], 0
+            current.append(correction)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _batch_explanations_prompt(self, corrections: List[Dict[str, Any]]) -> str:
         # Build the user block for all corrections
-        user_block = "\n".join(corrections_batch)
+        user_block = "\n".join(
+            f'[sentenceIndex {c["sentenceIndex"]}]\nOriginal: "{c["original"]}"\nCorrected: "{c["corrected"]}"'
+            for c in corrections
+        )
         
-        prompt = f'''
+        return f'''
             <|system|>
             You are a helpful and precise grammar coach.
-            Your job is to describe, in a short and objective way, what has changed between the two versions of a sentence.
+            Your job is to describe, in a short and objective way, what has changed between the two versions of each sentence.
             Do NOT evaluate the quality of the change. Only describe the difference.
 
-            Apply the following chain of thought:
-            1. Compare the original and corrected versions line by line.
-            2. For each line, detect the differences.
+            You will receive several sentence pairs, each labelled with its sentenceIndex.
+            Apply the following chain of thought to every pair separately:
+            1. Compare the original and corrected versions.
+            2. Detect the differences.
             3. For each difference, describe exactly what was changed (e.g., a word replacement, verb tense change, punctuation correction).
             4. Do not explain whether the change is good or bad. Do not rewrite the sentence again.
-            5. Combine these into a single concise message, written clearly for the end user.
+            5. Combine these into a single concise message per sentence, written clearly for the end user.
 
             Do not suggest or apply additional corrections. Only explain what was changed.
             Avoid vague or generalised comments.
             Avoid restating the full sentence. Focus only on the change.
 
-            Output format:
+            Output format: a JSON object with exactly one entry per sentence pair.
             {{
-                "message": "Changed X to Y because Z."
-                "delta": Float, from 0 to 1, how confident are you on the analysis.
+                "explanations": [
+                    {{
+                        "sentenceIndex": Integer, the sentenceIndex of the pair,
+                        "message": "Changed X to Y because Z."
+                    }}
+                ]
             }}
             <|end|>
 
@@ -135,14 +348,56 @@ class OllamaService:
 
             <|assistant|>
             '''
-        
-        return self.generate(prompt)
 
-    def generate_correction_explanation(self, original: str, corrected: str, changes: List[dict]):
-        """Generate explanation for a single grammar correction using the provided system prompt."""
-        if not changes:
-            return "No corrections needed. Your text looks good!"
-        prompt = f'''
+    def _map_batch_explanations(self, parsed: Any) -> Dict[int, str]:
+        """Map a batched reply onto sentenceIndex -> message"""
+        if isinstance(parsed, dict):
+            parsed = parsed.get("explanations", [parsed]) if "error" not in parsed else []
+        explanations = {}
+        for item in parsed if isinstance(parsed, list) else []:
+            if isinstance(item, dict) and "sentenceIndex" in item and item.get("message"):
+                try:
+                    explanations[int(item["sentenceIndex"])] = str(item["message"])
+                except (TypeError, ValueError):
+                    continue
+        return explanations
+
+    def generate_batch_explanations(self, corrections: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Explain many corrections with as few Ollama calls as the token budget allows.
+
+        Each correction is a dict with ``sentenceIndex``, ``original`` and
+        ``corrected``. Returns sentenceIndex -> message; sentences the model
+        skipped are simply missing from the result.
+        """
+        explanations = {}
+        for batch in self._pack_explanation_batches(corrections):
+            try:
+                parsed = self.generate_structured(self._batch_explanations_prompt(batch), BatchExplanations,
+                                                  cache=True)
+            except StructuredOutputError as e:
+                self.logger.error("Batched explanations failed", error=str(e), batch_size=len(batch))
+                continue
+            explanations.update(self._map_batch_explanations(parsed.model_dump()))
+        return explanations
+
+    async def agenerate_batch_explanations(self, corrections: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Async variant of generate_batch_explanations(); batches are issued concurrently"""
+        batches = self._pack_explanation_batches(corrections)
+        results = await asyncio.gather(*(
+            self.agenerate_structured(self._batch_explanations_prompt(batch), BatchExplanations, cache=True)
+            for batch in batches
+        ), return_exceptions=True)
+        explanations = {}
+        for batch, parsed in zip(batches, results):
+            if isinstance(parsed, Exception):
+                self.logger.error("Batched explanations failed", error=str(parsed), batch_size=len(batch))
+                continue
+            explanations.update(self._map_batch_explanations(parsed.model_dump()))
+        return explanations
+
+    def _correction_explanation_prompt(self, original: str, corrected: str) -> str:
+        return f'''
             <|system|>
             You are a helpful and precise grammar coach.
             Your job is to describe, in a short and objective way, what has changed between the two versions of a sentence.
@@ -161,7 +416,7 @@ class OllamaService:
 
             Output format:
             {{
-                "message": "Changed X to Y because Z."
+                "message": "Changed X to Y because Z.",
                 "delta": Float, from 0 to 1, how confident are you on the analysis.
             }}
             <|end|>
@@ -173,10 +428,32 @@ class OllamaService:
 
             <|assistant|>
             '''
-        return self.generate(prompt)
+
+    def generate_correction_explanation(self, original: str, corrected: str, changes: List[dict]):
+        """Generate explanation for a single grammar correction using the provided system prompt."""
+        if not changes:
+            return "No corrections needed. Your text looks good!"
+        try:
+            return self.generate_structured(self._correction_explanation_prompt(original, corrected),
+                                            CorrectionExplanation, cache=True).model_dump()
+        except StructuredOutputError as e:
+            return {"error": "Invalid explanation output", "raw": str(e)}
+
+    async def agenerate_correction_explanation(self, original: str, corrected: str, changes: List[dict]):
+        """Async variant of generate_correction_explanation() for issuing many explanations concurrently."""
+        if not changes:
+            return "No corrections needed. Your text looks good!"
+        try:
+            result = await self.agenerate_structured(self._correction_explanation_prompt(original, corrected),
+                                                     CorrectionExplanation, cache=True)
+            return result.model_dump()
+        except StructuredOutputError as e:
+            return {"error": "Invalid explanation output", "raw": str(e)}
     
-    def generate_content_insights(self, text: str, full_context: Optional[str] = None):
-        """Generate research insights, thought starters, and content references"""
+    INSIGHTS_OPTIONS = {"temperature": 0.1, "top_p": 0.9}
+
+    def ensure_insights_content(self, text: str, full_context: Optional[str] = None) -> str:
+        """Return the context to analyse, raising InsufficientContentError if it is too short"""
         # Use full context if available, otherwise use the provided text
         context_to_analyze = full_context if full_context else text
 
@@ -192,8 +469,10 @@ class OllamaService:
                           min_sentences=self.min_sentences,
                           min_words=self.min_words)
             raise InsufficientContentError(self.min_sentences, self.min_words)
-            
-        prompt = f'''
+        return context_to_analyze
+
+    def _content_insights_prompt(self, text: str) -> str:
+        return f'''
         <|system|>
         You are a research assistant and content strategist. Analyze the following text and provide valuable insights, thought starters, and references to help expand and enhance the content.
 
@@ -243,36 +522,38 @@ class OllamaService:
         - No need to break lines
 
         Required JSON structure:
-        [
-            {{
-                "id": 1,
-                "category": "Thought Starters & Ideas",
-                "suggestion": "Your specific suggestion here",
-                "description": "Brief explanation of why this is valuable"
-                "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
-            }},
-            {{
-                "id": 2,
-                "category": "Research References & Sources",
-                "suggestion": "Your specific suggestion here",
-                "description": "Brief explanation of why this is valuable"
-                "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
-            }},
-            {{
-                "id": 3,
-                "category": "Data & Statistics",
-                "suggestion": "Your specific suggestion here",
-                "description": "Brief explanation of why this is valuable"
-                "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
-            }},
-            {{
-                "id": 4,
-                "category": "Content Expansion Opportunities",
-                "suggestion": "Your specific suggestion here",
-                "description": "Brief explanation of why this is valuable"
-                "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
-            }},
-        ]
+        {{
+            "insights": [
+                {{
+                    "id": 1,
+                    "category": "Thought Starters & Ideas",
+                    "suggestion": "Your specific suggestion here",
+                    "description": "Brief explanation of why this is valuable",
+                    "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
+                }},
+                {{
+                    "id": 2,
+                    "category": "Research References & Sources",
+                    "suggestion": "Your specific suggestion here",
+                    "description": "Brief explanation of why this is valuable",
+                    "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
+                }},
+                {{
+                    "id": 3,
+                    "category": "Data & Statistics",
+                    "suggestion": "Your specific suggestion here",
+                    "description": "Brief explanation of why this is valuable",
+                    "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
+                }},
+                {{
+                    "id": 4,
+                    "category": "Content Expansion Opportunities",
+                    "suggestion": "Your specific suggestion here",
+                    "description": "Brief explanation of why this is valuable",
+                    "references": ["link 1 or title 1", "link 2 or title 2", "link 3 or title 3"]
+                }}
+            ]
+        }}
 
         DO NOT include any text before or after the JSON. Only return the JSON object.
         <|end|>
@@ -284,7 +565,62 @@ class OllamaService:
 
         <|assistant|>
         '''
-        return self.generate(prompt, options={"temperature": 0.1, "top_p": 0.9})
+
+    def generate_content_insights(self, text: str, full_context: Optional[str] = None):
+        """
+        Generate research insights, thought starters, and content references.
+
+        Returns the validated list of Insight objects; raises StructuredOutputError
+        if the model never produced output matching the InsightsResponse schema.
+        """
+        self.ensure_insights_content(text, full_context)
+        result = self.generate_structured(self._content_insights_prompt(text), InsightsResponse,
+                                          options=self.INSIGHTS_OPTIONS)
+        return result.insights
+
+    async def astream_generate(self, prompt: str, system: Optional[str] = None,
+                               options: Optional[Dict[str, Any]] = None,
+                               format: Optional[Dict[str, Any]] = None):
+        """Stream raw response text chunks from Ollama as they are generated"""
+        start_time = time.time()
+        generate_params = self._generate_params(prompt, system, options, format)
+        generate_params["stream"] = True
+        response_length = 0
+
+        client, semaphore = self._get_async_client()
+        async with semaphore:
+            async for part in await client.generate(**generate_params):
+                chunk = part["response"] if "response" in part else ""
+                response_length += len(chunk)
+                yield chunk
+
+        self.logger.info("Ollama streaming generation completed",
+                   model_name=self.model_name,
+                   generation_time=round(time.time() - start_time, 3),
+                   response_length=response_length)
+
+    async def astream_content_insights(self, text: str, full_context: Optional[str] = None, check: bool = True,
+                                       parse_stats: Optional[dict] = None):
+        """
+        Stream insights: yields each insight dict as soon as its closing brace arrives.
+
+        Pass ``check=False`` if ensure_insights_content() was already called.
+        When the stream completes, ``parse_stats`` (if given) receives the
+        parser's "parsed" and "skipped" object counts.
+        """
+        if check:
+            self.ensure_insights_content(text, full_context)
+        parser = IncrementalJSONObjectParser()
+        async for chunk in self.astream_generate(self._content_insights_prompt(text), options=self.INSIGHTS_OPTIONS,
+                                                 format=self._structured_format(InsightsResponse)):
+            for obj in parser.feed(chunk):
+                yield obj
+        if parse_stats is not None:
+            parse_stats.update(parsed=parser.objects_parsed, skipped=parser.objects_skipped)
+        if parser.objects_skipped:
+            self.logger.warning("Some streamed insights could not be parsed",
+                          parsed=parser.objects_parsed,
+                          skipped=parser.objects_skipped)
     
     def generate_combined_analysis(self, text: str, full_context: Optional[str] = None):
         """Generate both grammar explanations and content insights"""
@@ -0,0 +1,184 @@
+from typing import Dict, Optional
+from utils.logger import get_logger
+from utils import config
+import os
+import threading
+import time
+
+logger = get_logger("model_registry")
+
+# Sentence tokenizer data: punkt_tab for NLTK >= 3.8.2, the pickled punkt before that
+def _punkt_resources():
+    """(package, path) of the Punkt data this NLTK loads: punkt_tab from 3.8.2 on, the punkt pickle before"""
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer  # noqa: F401
+        return (("punkt_tab", "tokenizers/punkt_tab/english/"),)
+    except ImportError:
+        return (("punkt", "tokenizers/punkt/english.pickle"),)
+
+
+class ModelsNotReady(Exception):
+    """Raised when models are requested before startup has finished"""
+
+
+def ensure_nltk_data(download_allowed: bool = False):
+    """
+    Make the Punkt sentence tokenizer data available without network access.
+
+    NLTK_DATA_DIR is searched first (bundle the data there for offline images);
+    downloads only happen when MODEL_DOWNLOAD_ALLOWED is set.
+    """
+    import nltk
+
+    data_dir = os.path.abspath(config.NLTK_DATA_DIR)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    resources = _punkt_resources()
+    for name, resource in resources:
+        try:
+            nltk.data.find(resource)
+            return
+        except LookupError:
+            continue
+
+    if not download_allowed:
+        raise RuntimeError(f"NLTK {resources[0][0]} data not found (searched {data_dir} and the NLTK defaults). "
+                           f"Run download_models.py or set MODEL_DOWNLOAD_ALLOWED=true")
+    for name, _ in resources:
+        nltk.download(name, download_dir=data_dir, quiet=True)
+
+
+class ModelRegistry:
+    """
+    Owns the grammar and insights models and the startup pipeline.
+
+    prepare() runs the phases in order (NLTK data, imports, grammar model,
+    insights generator, warmup) once, timing each one. It is safe to call from
+    several threads: late callers wait for the first one. ``state`` is
+    "not_started", "loading", "ready" or "failed".
+    """
+
+    def __init__(self):
+        self.grammar_corrector = None
+        self.insights_generator = None
+        self.state = "not_started"
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.loaded = False
+        self.warmed_up = False
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def _phase(self, name: str, fn):
+        start_time = time.time()
+        result = fn()
+        self.phases[name] = round(time.time() - start_time, 3)
+        logger.info("Startup phase completed", phase=name, phase_time=self.phases[name])
+        return result
+
+    def load(self):
+        """Load models without running them (safe before fork)"""
+        with self._lock:
+            if self.loaded:
+                return
+            if self.state != "ready":
+                self.state = "loading"
+            try:
+                self._phase("nltk_data", _load_sentence_tokenizer)
+                # transformers/torch imports alone take seconds, so they are timed (and deferred) too
+                GrammarCorrector, InsightsGenerator = self._phase("imports", _import_models)
+                self.grammar_corrector = self._phase("grammar_model", GrammarCorrector)
+                self.insights_generator = self._phase("insights_generator", InsightsGenerator)
+                self.loaded = True
+                self.error = None
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                logger.error("Model loading failed", error=str(e), phases=self.phases)
+                raise
+
+    def warmup(self):
+        """Run one sentence split and one generation so the first request doesn't pay for lazy init"""
+        with self._lock:
+            if self.warmed_up or not self.loaded:
+                return
+            try:
+                if config.MODEL_WARMUP_ENABLED:
+                    from utils.segmentation import sentence_spans
+                    self._phase("warmup", lambda: (
+                        sentence_spans("Warm up the tokenizer. It has two sentences."),
+                        self.grammar_corrector.infer_batch(["This sentence have a error."])
+                    ))
+                self.warmed_up = True
+            except Exception as e:
+                self.state = "failed"
+                self.error = f"Warmup failed: {e}"
+                logger.error("Model warmup failed", error=str(e))
+                raise
+
+    def prepare(self):
+        """Load and warm up; marks the registry ready"""
+        if self.ready:
+            return
+        start_time = time.time()
+        self.load()
+        self.warmup()
+        with self._lock:
+            if self.state != "ready":
+                self.state = "ready"
+                logger.info("Models ready",
+                            phases=self.phases,
+                            total_time=round(sum(self.phases.values()), 3),
+                            prepare_time=round(time.time() - start_time, 3))
+
+    def start_background(self):
+        """Run prepare() in a daemon thread (the server accepts connections meanwhile)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            try:
+                self.prepare()
+            except Exception:
+                pass  # Recorded in state/error and reported by /ready
+
+        self._thread = threading.Thread(target=run, name="model-loader", daemon=True)
+        self._thread.start()
+
+    def get(self):
+        """Return the registry if ready, else raise ModelsNotReady"""
+        if not self.ready:
+            detail = f"Models are {self.state.replace('_', ' ')}"
+            if self.error:
+                detail += f": {self.error}"
+            raise ModelsNotReady(detail)
+        return self
+
+    def status(self) -> dict:
+        return {
+            "status": self.state,
+            "error": self.error,
+            "phases": dict(self.phases),
+            "loading_mode": config.MODEL_LOADING,
+        }
+
+
+def _load_sentence_tokenizer():
+    ensure_nltk_data(config.MODEL_DOWNLOAD_ALLOWED)
+    from utils.segmentation import get_sentence_tokenizer
+    get_sentence_tokenizer()
+
+
+def _import_models():
+    from models.grammar_corrector import GrammarCorrector
+    from models.insights_generator import InsightsGenerator
+    return GrammarCorrector, InsightsGenerator
+
+
+registry = ModelRegistry()
@@ -0,0 +1,169 @@
+from typing import List, Optional, Tuple
+import torch
+
+# Consecutive fully rejected drafts before giving up on drafting for a sequence
+_MAX_REJECTED_DRAFTS = 4
+
+
+class SpeculativeStats:
+    """Counters for input-copy speculative decoding"""
+
+    def __init__(self):
+        self.sequences = 0
+        self.steps = 0
+        self.tokens = 0
+        self.drafted = 0
+        self.accepted = 0
+        self.fallbacks = 0
+
+    def merge(self, other: "SpeculativeStats"):
+        self.sequences += other.sequences
+        self.steps += other.steps
+        self.tokens += other.tokens
+        self.drafted += other.drafted
+        self.accepted += other.accepted
+        self.fallbacks += other.fallbacks
+
+    def as_dict(self) -> dict:
+        return {
+            "sequences": self.sequences,
+            "decoder_steps": self.steps,
+            "tokens_generated": self.tokens,
+            "tokens_per_step": round(self.tokens / self.steps, 3) if self.steps else 0.0,
+            "draft_tokens": self.drafted,
+            "draft_tokens_accepted": self.accepted,
+            "acceptance_rate": round(self.accepted / self.drafted, 4) if self.drafted else 0.0,
+            "fallbacks_to_plain_decoding": self.fallbacks,
+        }
+
+
+def _find_draft(source: List[int], generated: List[int], cursor: int,
+                ngram_size: int, num_draft_tokens: int) -> Tuple[List[int], int]:
+    """
+    Prompt-lookup drafting: match the last n tokens produced against the source
+    and propose the source tokens that follow the match.
+
+    Matches at or after ``cursor`` (where the previous draft was taken from) are
+    preferred, since corrections mostly walk through the source left to right.
+    """
+    if not generated:
+        return source[:num_draft_tokens], 0
+
+    for n in range(min(ngram_size, len(generated)), 0, -1):
+        tail = generated[-n:]
+        best = None
+        for start in range(0, len(source) - n):
+            if source[start:start + n] == tail:
+                best = start
+                if start + n >= cursor:
+                    break
+        if best is not None:
+            follow = best + n
+            return source[follow:follow + num_draft_tokens], follow
+    return [], cursor
+
+
+def _crop_past(past_key_values, length: int):
+    """Drop self-attention cache entries beyond ``length`` decoder positions"""
+    if hasattr(past_key_values, "crop"):
+        past_key_values.crop(length)
+        return past_key_values
+    # Legacy tuple format: (self_k, self_v, cross_k, cross_v) per layer
+    return tuple(
+        (layer[0][:, :, :length, :], layer[1][:, :, :length, :]) + tuple(layer[2:])
+        for layer in past_key_values
+    )
+
+
+@torch.inference_mode()
+def copy_speculative_generate(model, input_ids: torch.Tensor, attention_mask: Optional[torch.Tensor],
+                              max_length: int, num_draft_tokens: int = 10,
+                              ngram_size: int = 3) -> Tuple[List[int], SpeculativeStats]:
+    """
+    Greedy decoding of a single sequence with drafts copied from the input.
+
+    Each step feeds the pending token plus a draft copied from the source to the
+    decoder in one forward pass. Draft tokens are accepted while they equal the
+    model's argmax, and the first disagreement is replaced by the model's own
+    token, so the result is identical to greedy decoding. Returns the output ids
+    (starting with the decoder start token, like generate()) and step counters.
+    """
+    stats = SpeculativeStats()
+    stats.sequences = 1
+
+    start_id = model.config.decoder_start_token_id
+    eos_id = model.config.eos_token_id
+    source = input_ids[0].tolist()
+
+    encoder_outputs = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask, return_dict=True)
+
+    generated: List[int] = []
+    pending = [start_id]
+    processed = 0  # decoder positions held in the cache
+    past = None
+    cursor = 0
+    rejected_in_a_row = 0
+    drafting = True
+
+    while True:
+        remaining = max_length - 1 - len(generated)
+        if remaining <= 0:
+            break
+
+        draft: List[int] = []
+        if drafting:
+            draft, cursor = _find_draft(source, generated, cursor, ngram_size, num_draft_tokens)
+            draft = draft[:remaining - 1]
+
+        decoder_input_ids = torch.tensor([pending + draft], device=input_ids.device)
+        outputs = model(
+            encoder_outputs=encoder_outputs,
+            attention_mask=attention_mask,
+            decoder_input_ids=decoder_input_ids,
+            past_key_values=past,
+            use_cache=True,
+            return_dict=True,
+        )
+        # Position len(pending)-1 predicts the token after the pending one,
+        # each following position predicts the token after the draft token before it
+        predictions = outputs.logits[0, len(pending) - 1:].argmax(-1).tolist()
+        stats.steps += 1
+
+        accepted = 0
+        for token in draft:
+            if predictions[accepted] != token:
+                break
+            accepted += 1
+            if token == eos_id:
+                break
+        stats.drafted += len(draft)
+        stats.accepted += accepted
+
+        new_tokens = draft[:accepted]
+        finished = bool(new_tokens) and new_tokens[-1] == eos_id
+        if not finished:
+            # The model's own token at the first disagreement (or after a fully accepted draft)
+            new_tokens.append(predictions[accepted])
+            finished = new_tokens[-1] == eos_id
+        generated.extend(new_tokens)
+        stats.tokens += len(new_tokens)
+
+        if draft and accepted == 0:
+            rejected_in_a_row += 1
+            if rejected_in_a_row >= _MAX_REJECTED_DRAFTS:
+                # The output has diverged from the input: continue as plain greedy decoding
+                drafting = False
+                stats.fallbacks += 1
+        elif accepted:
+            rejected_in_a_row = 0
+            cursor += accepted
+
+        if finished:
+            break
+
+        # Keep the cache for the pending token and the accepted draft only
+        processed += len(pending) + accepted
+        past = _crop_past(outputs.past_key_values, processed)
+        pending = [new_tokens[-1]]
+
+    return [start_id] + generated[:max_length - 1], stats
@@ -1,11 +1,24 @@
 import os
-from models.insights_generator import InsightsGenerator
-from fastapi import APIRouter, HTTPException, Depends, status
-from models.grammar_corrector import GrammarCorrector
-from schemas.prompt import Prompt, GrammarAnalysisResponse, InsightsResponse
-from utils.split import split_into_sentences
-from models.ollama_service import InsufficientContentError
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from models.registry import ModelRegistry, ModelsNotReady, registry
+from models.job_runner import job_runner
+from schemas.prompt import Prompt, GrammarAnalysisResponse, GrammarBatchResponse, InsightsResponse
+from utils.segmentation import sentence_spans
+from models.ollama_service import InsufficientContentError, StructuredOutputError
 from utils.logger import get_logger
+from utils.executors import run_in_inference_pool, run_in_ollama_pool
+from utils.single_flight import SingleFlight
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.cache import content_hash
+from utils.memory import memory_breakdown, to_mb
+from utils import config
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, List, Tuple
+import json
 import time
 
 from utils.jwt import verify_jwt
@@ -14,23 +27,116 @@ from utils.jwt import verify_jwt
 logger = get_logger("inference")
 
 router = APIRouter()
-grammar_corrector = GrammarCorrector()
-insights_generator = InsightsGenerator()
+
+# Identical concurrent payloads share one computation
+grammar_flight = SingleFlight("grammar")
+insights_flight = SingleFlight("insights")
+
+# Bounded, per-user fair queues in front of the model and Ollama
+grammar_admission = AdmissionController(
+    "grammar",
+    max_concurrency=config.GRAMMAR_ADMISSION_CONCURRENCY,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    per_user_concurrency=config.ADMISSION_PER_USER_CONCURRENCY,
+    per_user_queue=config.ADMISSION_PER_USER_QUEUE
+)
+insights_admission = AdmissionController(
+    "insights",
+    max_concurrency=config.INSIGHTS_ADMISSION_CONCURRENCY,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    per_user_concurrency=config.ADMISSION_PER_USER_CONCURRENCY,
+    per_user_queue=config.ADMISSION_PER_USER_QUEUE
+)
+
+async def _models() -> ModelRegistry:
+    """The loaded models: loads them on first use in lazy mode, otherwise 503 until ready"""
+    if not registry.ready and config.MODEL_LOADING == "lazy":
+        try:
+            await run_in_inference_pool(registry.prepare)
+        except Exception:
+            pass  # Reported below
+    try:
+        return registry.get()
+    except ModelsNotReady as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e),
+                            headers={"Retry-After": "5"})
+
+def _too_busy(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e),
+                         headers={"Retry-After": str(e.retry_after)})
+
+async def admit(controller: AdmissionController, user_claims: dict, may_reject: bool = True) -> Callable[[], None]:
+    """
+    Take an admission slot for the caller's JWT subject, or fail with 429
+    (unless ``may_reject`` is False, see AdmissionController.acquire).
+
+    Returns the function that frees the slot; calling it more than once is a
+    no-op. Pass ``completed=False`` when the slot is handed back without the
+    work having run in it, so it does not count towards the service time.
+    """
+    if not config.ADMISSION_ENABLED:
+        return lambda: None
+    try:
+        user = await controller.acquire(user_claims.get("sub"), may_reject)
+    except AdmissionRejected as e:
+        raise _too_busy(e)
+    start_time = time.monotonic()
+    released = False
+
+    def release(completed: bool = True):
+        nonlocal released
+        if not released:
+            released = True
+            controller.release(user, time.monotonic() - start_time if completed else None)
+    return release
+
+@asynccontextmanager
+async def admitted(controller: AdmissionController, user_claims: dict):
+    """Hold an admission slot for the duration of the block"""
+    release = await admit(controller, user_claims)
+    try:
+        yield
+    finally:
+        release()
+
+async def run_admitted(controller: AdmissionController, user_claims: dict, flight: SingleFlight, key: str,
+                       fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Await ``flight.do(key, fn)`` after admitting the caller.
+
+    Every caller is admitted under its own JWT subject, so it waits its own
+    turn, is charged to its own quota and gets its own 429. A caller that
+    then joins an identical computation already in flight hands its slot
+    straight back, so only the caller that runs the work holds a slot while
+    it runs.
+    """
+    release = await admit(controller, user_claims)
+    try:
+        if flight.in_flight(key):
+            release(completed=False)
+        return await flight.do(key, fn)
+    finally:
+        release()
 
 @router.post("/grammar", response_model=GrammarAnalysisResponse)
 async def grammar(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
     """Grammar correction only endpoint"""
     start_time = time.time()
+    grammar_corrector = (await _models()).grammar_corrector
     
     logger.info("Grammar correction request received",
                text_length=len(prompt.text),
                include_explanations=prompt.include_explanations)
     
     try:
-        result = grammar_corrector.analyse(
-            original=prompt.text,
-            include_explanations=prompt.include_explanations or False
-        )
+        include_explanations = prompt.include_explanations or False
+        key = content_hash(prompt.text, include_explanations, prompt.correction_mode)
+        result = await run_admitted(grammar_admission, user_claims, grammar_flight, key,
+                                    lambda: grammar_corrector.aanalyse(
+                                        original=prompt.text,
+                                        include_explanations=include_explanations,
+                                        mode=prompt.correction_mode
+                                    ))
         
         process_time = time.time() - start_time
         logger.info("Grammar correction completed successfully",
@@ -38,6 +144,8 @@ async def grammar(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
                    sentence_count=len(result["sentences"]))
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         process_time = time.time() - start_time
         logger.error("Grammar correction failed",
@@ -45,17 +153,181 @@ async def grammar(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
                     process_time=round(process_time, 3))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/grammar/stream")
+async def grammar_stream(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
+    """
+    Streaming grammar correction (NDJSON).
+
+    Emits a "correction" frame, then a "sentence" frame per SentenceAnalysis as
+    its explanation completes, then a "summary" frame.
+    """
+    start_time = time.time()
+    grammar_corrector = (await _models()).grammar_corrector
+
+    logger.info("Streaming grammar correction request received",
+               text_length=len(prompt.text),
+               include_explanations=prompt.include_explanations)
+
+    # The slot is taken before responding (so overload is a real 429) and held until the stream ends
+    release = await admit(grammar_admission, user_claims)
+
+    async def frames():
+        try:
+            async for frame in grammar_corrector.astream_analyse(
+                original=prompt.text,
+                include_explanations=prompt.include_explanations or False,
+                mode=prompt.correction_mode
+            ):
+                yield json.dumps(frame) + "\n"
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error("Streaming grammar correction failed",
+                        error=str(e),
+                        process_time=round(process_time, 3))
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            release()
+
+    # The background task also frees the slot if the client leaves before the stream starts
+    return StreamingResponse(frames(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
+_prompt_list = TypeAdapter(List[Prompt])
+
+async def _read_batch(request: Request) -> Tuple[List[Prompt], bool]:
+    """Parse a JSON array of Prompts, or one Prompt per line for NDJSON; returns (prompts, is_ndjson)"""
+    is_ndjson = "ndjson" in request.headers.get("content-type", "")
+    body = await request.body()
+    try:
+        if is_ndjson:
+            prompts = []
+            for n, line in enumerate(body.splitlines()):
+                if line.strip():
+                    try:
+                        prompts.append(Prompt.model_validate_json(line))
+                    except ValidationError as e:
+                        raise RequestValidationError(
+                            [{**error, "loc": ("body", n, *error["loc"])} for error in e.errors()])
+        else:
+            prompts = _prompt_list.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+    if not prompts:
+        raise HTTPException(status_code=400, detail="No documents in batch")
+    if len(prompts) > config.GRAMMAR_BULK_MAX_DOCUMENTS:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch has {len(prompts)} documents, the limit is {config.GRAMMAR_BULK_MAX_DOCUMENTS}")
+    return prompts, is_ndjson
+
+def _batch_summary(document_count: int, sentence_count: int, start_time: float) -> dict:
+    process_time = time.time() - start_time
+    return {
+        "documentCount": document_count,
+        "sentenceCount": sentence_count,
+        "processTime": round(process_time, 3),
+        "documentsPerSecond": round(document_count / process_time, 2) if process_time else 0.0,
+        "sentencesPerSecond": round(sentence_count / process_time, 2) if process_time else 0.0
+    }
+
+@router.post("/grammar/batch", response_model=GrammarBatchResponse,
+             openapi_extra={"requestBody": {"required": True, "content": {
+                 "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/Prompt"}}},
+                 "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/Prompt"}}
+             }}})
+async def grammar_batch(request: Request, user_claims: dict = Depends(verify_jwt)):
+    """
+    Bulk grammar correction.
+
+    Takes a JSON array of Prompts and answers with a GrammarBatchResponse, or
+    one Prompt per line (Content-Type: application/x-ndjson) and streams a
+    "result" frame per document (with its input "index") in input order,
+    then a "summary" frame. Sentences of all documents share batched
+    generate() calls. Every chunk of about GRAMMAR_BULK_CHUNK_SENTENCES
+    sentences takes its own admission slot, so a large batch waits its turn
+    between chunks like any other request of its user.
+    """
+    start_time = time.time()
+    prompts, is_ndjson = await _read_batch(request)
+    grammar_corrector = (await _models()).grammar_corrector
+
+    logger.info("Batch grammar correction request received",
+               document_count=len(prompts),
+               text_length=sum(len(prompt.text) for prompt in prompts),
+               ndjson=is_ndjson)
+
+    # The first chunk's slot is taken before responding (so overload is a real 429); later
+    # chunks queue for theirs without being rejected, as the batch was already accepted
+    first_slot = [await admit(grammar_admission, user_claims)]
+
+    async def admit_chunk() -> Callable[[], None]:
+        if first_slot:
+            return first_slot.pop()
+        return await admit(grammar_admission, user_claims, may_reject=False)
+
+    def release():
+        while first_slot:
+            first_slot.pop()()
+
+    results = grammar_corrector.aanalyse_many(
+        [prompt.text for prompt in prompts],
+        [prompt.include_explanations or False for prompt in prompts],
+        [prompt.correction_mode for prompt in prompts],
+        admit=admit_chunk)
+
+    if not is_ndjson:
+        try:
+            responses = [response async for _, response in results]
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error("Batch grammar correction failed",
+                        error=str(e),
+                        process_time=round(process_time, 3))
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            await results.aclose()
+            release()
+        summary = _batch_summary(len(responses), sum(len(r["sentences"]) for r in responses), start_time)
+        logger.info("Batch grammar correction completed successfully", **summary)
+        return {"results": responses, "summary": summary}
+
+    async def frames():
+        document_count = sentence_count = 0
+        try:
+            async for index, response in results:
+                document_count += 1
+                sentence_count += len(response["sentences"])
+                yield json.dumps({"type": "result", "index": index, **response}) + "\n"
+            summary = _batch_summary(document_count, sentence_count, start_time)
+            logger.info("Batch grammar correction completed successfully", **summary)
+            yield json.dumps({"type": "summary", **summary}) + "\n"
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error("Batch grammar correction failed",
+                        error=str(e),
+                        completed=document_count,
+                        process_time=round(process_time, 3))
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            await results.aclose()
+            release()
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
 @router.post("/insights", response_model=InsightsResponse)
 async def insights(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
     """Content insights only endpoint - uses original text as base rate"""
     start_time = time.time()
+    insights_generator = (await _models()).insights_generator
     
     logger.info("Content insights request received",
                text_length=len(prompt.text),
                has_full_context=prompt.full_context is not None)
     
     try:
-        insights = insights_generator.generate(prompt.text, prompt.full_context)
+        key = content_hash(prompt.text, prompt.full_context)
+        insights = await run_admitted(insights_admission, user_claims, insights_flight, key,
+                                      lambda: run_in_ollama_pool(
+                                          insights_generator.generate, prompt.text, prompt.full_context))
         process_time = time.time() - start_time
         logger.info("Content insights completed successfully",
                    process_time=round(process_time, 3),
@@ -70,6 +342,14 @@ async def insights(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
                       error=str(e),
                       process_time=round(process_time, 3))
         raise HTTPException(status_code=400, detail=str(e))
+    except StructuredOutputError as e:
+        process_time = time.time() - start_time
+        logger.error("Content insights failed - unusable model output",
+                    error=str(e),
+                    process_time=round(process_time, 3))
+        raise HTTPException(status_code=502, detail=f"Failed to generate insights: {e}")
+    except HTTPException:
+        raise
     except Exception as e:
         process_time = time.time() - start_time
         logger.error("Content insights failed",
@@ -77,6 +357,52 @@ async def insights(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
                     process_time=round(process_time, 3))
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {e}")
 
+@router.post("/insights/stream")
+async def insights_stream(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
+    """
+    Streaming content insights (NDJSON).
+
+    Emits an "insight" frame for each insight as soon as the model finishes it,
+    then a "summary" frame.
+    """
+    start_time = time.time()
+    insights_generator = (await _models()).insights_generator
+
+    logger.info("Streaming content insights request received",
+               text_length=len(prompt.text),
+               has_full_context=prompt.full_context is not None)
+
+    try:
+        await run_in_inference_pool(insights_generator.ollama.ensure_insights_content,
+                                    prompt.text, prompt.full_context)
+    except InsufficientContentError as e:
+        logger.warning("Content insights request rejected - insufficient content", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    release = await admit(insights_admission, user_claims)
+
+    async def frames():
+        count = 0
+        try:
+            async for insight in insights_generator.astream(prompt.text, prompt.full_context, check=False):
+                count += 1
+                yield json.dumps({"type": "insight", **insight.model_dump()}) + "\n"
+            process_time = time.time() - start_time
+            logger.info("Streaming content insights completed",
+                       process_time=round(process_time, 3),
+                       insights_length=count)
+            yield json.dumps({"type": "summary", "insightCount": count, "processTime": round(process_time, 3)}) + "\n"
+        except Exception as e:
+            process_time = time.time() - start_time
+            logger.error("Streaming content insights failed",
+                        error=str(e),
+                        process_time=round(process_time, 3))
+            yield json.dumps({"type": "error", "detail": f"Failed to generate insights: {e}"}) + "\n"
+        finally:
+            release()
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
 @router.post("/check-base-rate")
 async def check_base_rate(prompt: Prompt, user_claims: dict = Depends(verify_jwt)):
     """Check if content meets minimum requirements for insights analysis"""
@@ -84,16 +410,14 @@ async def check_base_rate(prompt: Prompt, user_claims: dict = Depends(verify_jwt
                 text_length=len(prompt.text),
                 has_full_context=prompt.full_context is not None)
     
+    ollama = (await _models()).insights_generator.ollama
+    context = prompt.full_context if prompt.full_context else prompt.text
     try:
-        meets_requirements = model.ollama._meets_threshold(
-            prompt.full_context if prompt.full_context else prompt.text
-        )
+        meets_requirements = await run_in_inference_pool(ollama._meets_threshold, context)
         
         if meets_requirements:
-            sentences = split_into_sentences(
-                prompt.full_context if prompt.full_context else prompt.text
-            )
-            word_count = len((prompt.full_context if prompt.full_context else prompt.text).split())
+            sentences = await run_in_inference_pool(sentence_spans, context)
+            word_count = len(context.split())
             
             logger.debug("Base rate check passed",
                         sentence_count=len(sentences),
@@ -103,18 +427,49 @@ async def check_base_rate(prompt: Prompt, user_claims: dict = Depends(verify_jwt
                 "meets_base_rate": True,
                 "sentence_count": len(sentences),
                 "word_count": word_count,
-                "min_sentences": model.ollama.min_sentences,
-                "min_words": model.ollama.min_words
+                "min_sentences": ollama.min_sentences,
+                "min_words": ollama.min_words
             }
         else:
             logger.debug("Base rate check failed",
-                        min_sentences=model.ollama.min_sentences,
-                        min_words=model.ollama.min_words)
+                        min_sentences=ollama.min_sentences,
+                        min_words=ollama.min_words)
             
             return {
                 "meets_base_rate": False,
-                "message": f"Need at least {model.ollama.min_sentences} sentences and {model.ollama.min_words} words for insights analysis"
+                "message": f"Need at least {ollama.min_sentences} sentences and {ollama.min_words} words for insights analysis"
             }
     except Exception as e:
         logger.error("Base rate check failed", error=str(e))
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats")
+async def stats(user_claims: dict = Depends(verify_jwt)):
+    """Cache, batching and structured-output counters"""
+    memory = memory_breakdown()
+    process = {
+        "pid": os.getpid(),
+        "memory_mb": {name: to_mb(value) if value is not None else None for name, value in memory.items()}
+    }
+    if not registry.ready:
+        return {"process": process, "models": registry.status()}
+    grammar_corrector, insights_generator = registry.grammar_corrector, registry.insights_generator
+    return {
+        "process": process,
+        "models": registry.status(),
+        "grammar": grammar_corrector.stats(),
+        "insights_cache": insights_generator.cache.stats(),
+        "admission": {
+            "grammar": grammar_admission.stats(),
+            "insights": insights_admission.stats()
+        },
+        "jobs": await job_runner.stats(),
+        "single_flight": {
+            "grammar": grammar_flight.stats(),
+            "insights": insights_flight.stats()
+        },
+        "structured_output": {
+            "grammar_explanations": grammar_corrector.ollama.structured_output_stats(),
+            "insights": insights_generator.ollama.structured_output_stats()
+        }
+    }
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from models.job_runner import job_runner
+from schemas.prompt import Prompt, JobStatus
+from utils.job_store import JobStore, get_job_store
+from utils.logger import get_logger
+from utils.jwt import verify_jwt
+from utils import config
+import asyncio
+
+logger = get_logger("jobs")
+
+router = APIRouter()
+
+
+def _store() -> JobStore:
+    store = get_job_store()
+    if store is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job API is disabled")
+    return store
+
+
+def _job_status(job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "createdAt": job["created_at"],
+        "startedAt": job["started_at"],
+        "finishedAt": job["finished_at"],
+    }
+
+
+def _queue_full(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail,
+                         headers={"Retry-After": str(max(1, round(config.JOB_POLL_SECONDS * 30)))})
+
+
+async def _submit(kind: str, prompt: Prompt, user_claims: dict, response: Response) -> dict:
+    store = _store()
+    owner = user_claims.get("sub")
+    # Per-user cap first, so one client filling its share cannot also fill the global queue
+    if await asyncio.to_thread(store.queued_count_for, owner) >= config.JOB_MAX_QUEUED_PER_USER:
+        logger.warning("Job rejected, user queue full", kind=kind, owner=owner)
+        raise _queue_full("Too many queued jobs for this user")
+    if await asyncio.to_thread(store.queued_count) >= config.JOB_MAX_QUEUED:
+        raise _queue_full("Job queue is full")
+    job = await asyncio.to_thread(store.create, kind, prompt.model_dump(), owner)
+    job_runner.notify()
+    logger.info("Job submitted", job_id=job["id"], kind=kind, text_length=len(prompt.text))
+    response.headers["Location"] = f"/api/v1/jobs/{job['id']}"
+    return _job_status(job)
+
+
+async def _owned_job(job_id: str, user_claims: dict) -> dict:
+    """The job if it exists and belongs to the caller, else 404"""
+    job = await asyncio.to_thread(_store().get, job_id)
+    if job is None or job["owner"] != user_claims.get("sub"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/grammar", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_grammar_job(prompt: Prompt, response: Response, user_claims: dict = Depends(verify_jwt)):
+    """Queue a grammar analysis (same input as /grammar); poll /jobs/{id} for progress"""
+    return await _submit("grammar", prompt, user_claims, response)
+
+
+@router.post("/jobs/insights", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_insights_job(prompt: Prompt, response: Response, user_claims: dict = Depends(verify_jwt)):
+    """Queue a content insights analysis (same input as /insights); poll /jobs/{id} for progress"""
+    return await _submit("insights", prompt, user_claims, response)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, user_claims: dict = Depends(verify_jwt)):
+    """Status and progress of one of the caller's jobs"""
+    return _job_status(await _owned_job(job_id, user_claims))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, user_claims: dict = Depends(verify_jwt)):
+    """
+    Result of a finished job: a GrammarAnalysisResponse or InsightsResponse.
+
+    409 while the job is queued or running (and with the error once it failed).
+    """
+    job = await _owned_job(job_id, user_claims)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job failed: {job['error']}")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job['status']}",
+                            headers={"Retry-After": str(max(1, round(config.JOB_POLL_SECONDS)))})
+    return job["result"]
@@ -1,11 +1,12 @@
 from pydantic import BaseModel
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 
 class Prompt(BaseModel):
     text: str
     full_context: Optional[str] = None  # For insights analysis - broader context
     analysis_type: Optional[str] = "grammar"  # "grammar", "insights", or "both"
     include_explanations: Optional[bool] = False  # Whether to generate Ollama explanations (default: False for performance)
+    correction_mode: Optional[Literal["paragraph", "sentence"]] = None  # Defaults to GRAMMAR_CORRECTION_MODE
 
 class Change(BaseModel):
     startIndex: int  # Start position of the change
@@ -14,16 +15,53 @@ class Change(BaseModel):
 
 class SentenceAnalysis(BaseModel):
     sentenceIndex: int # Position of the sentence in paragraph
+    startIndex: Optional[int] = None # Offset of the original sentence in the paragraph
+    endIndex: Optional[int] = None # Offset just past the original sentence
     original: str # Original sentence
     corrected: str # Corrected sentence
     changes: List[Change] # List of changes in the sentence
     explanation: Optional[str] = None # Ollama-generated explanation of corrections
 
+class DecodingProfileInfo(BaseModel):
+    name: str # Decoding profile used ("beam", "greedy" or "speculative")
+    numBeams: int # Beam width of the profile
+    maxLength: int # Output length limit derived from the input token count
+    degraded: bool # Whether load forced a cheaper profile than configured
+    reason: Optional[str] = None # "queue_depth" or "p95_latency" when degraded
+
 class GrammarAnalysisResponse(BaseModel):
     original: str # Full original paragraph
     corrected: str # Full corrected paragraph
     paragraphDiffs: List[Change] # List of changes in the paragraph
     sentences: List[SentenceAnalysis] # Detailed sentence by sentence analysis
+    decodingProfile: Optional[DecodingProfileInfo] = None # How the correction was decoded
+
+class BatchSummary(BaseModel):
+    documentCount: int # Documents corrected
+    sentenceCount: int # Sentences across all documents
+    processTime: float # Seconds from request to last result
+    documentsPerSecond: float # Throughput in documents
+    sentencesPerSecond: float # Throughput in sentences
+
+class GrammarBatchResponse(BaseModel):
+    results: List[GrammarAnalysisResponse] # One result per document, in input order
+    summary: BatchSummary # Totals and throughput
+
+class JobProgress(BaseModel):
+    stage: str # "queued", "correcting", "explaining", "generating" or "done"
+    completed: Optional[int] = None # Explanations finished so far (grammar jobs)
+    total: Optional[int] = None # Explanations needed (grammar jobs)
+
+class JobStatus(BaseModel):
+    id: str # Job id, used to poll status and fetch the result
+    kind: str # "grammar" or "insights"
+    status: str # "queued", "running", "succeeded" or "failed"
+    progress: Optional[JobProgress] = None # Where a running job is
+    attempts: int # Times a worker has picked the job up
+    error: Optional[str] = None # Why the job failed
+    createdAt: float # Submission time (Unix seconds)
+    startedAt: Optional[float] = None # Time the latest attempt started
+    finishedAt: Optional[float] = None # Completion time
 
 class Insight(BaseModel):
     id: int # The id of the insight
@@ -39,4 +77,16 @@ class ErrorResponse(BaseModel):
     error: str # The error message
     raw: Optional[str] = None # The raw response from the model
 
-OllamaGeneralResult = Union[InsightsResponse, ErrorResponse]
\ No newline at end of file
+OllamaGeneralResult = Union[InsightsResponse, ErrorResponse]
+
+
+class CorrectionExplanation(BaseModel):
+    message: str # What changed between original and corrected sentence
+    delta: Optional[float] = None # Model confidence in the analysis, from 0 to 1
+
+class SentenceExplanation(BaseModel):
+    sentenceIndex: int # Position of the sentence in paragraph
+    message: str # What changed in that sentence
+
+class BatchExplanations(BaseModel):
+    explanations: List[SentenceExplanation] # One explanation per changed sentence
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Multi-process server sharing one copy of the model weights.
+
+Usage:
+    python serve.py [--workers N] [--host 0.0.0.0] [--port 8000] [--threads-per-worker T]
+
+The parent process imports the app and loads the models, freezes
+the garbage collector so the loaded objects are never written to again, and
+then forks the workers. Every worker serves the same listening socket and
+reads the weights from pages it shares copy-on-write with the parent, so an
+extra worker costs its private working memory instead of another model copy.
+Dead workers are re-forked from the parent. Per-worker and total RSS/PSS are
+logged at startup and every --memory-report-interval seconds.
+
+Linux/macOS only (needs os.fork). For a single process, `python main.py` or
+`uvicorn main:app` still work as before.
+"""
+
+import sys
+import os
+import gc
+import time
+import signal
+import socket
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.logger import get_logger
+from utils.memory import memory_report, rss_bytes, to_mb
+
+logger = get_logger("serve")
+
+def parse_args():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=cpus)
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--memory-report-interval", type=float, default=60.0)
+    args = parser.parse_args()
+    if args.threads_per_worker is None:
+        args.threads_per_worker = max(1, cpus // max(1, args.workers))
+    return args
+
+def load_app():
+    """Import the app in the parent so models are loaded once, before forking"""
+    import torch
+    # Keep the parent single-threaded: an intra-op pool started before fork() is not fork-safe
+    torch.set_num_threads(1)
+
+    start_time = time.time()
+    from main import app
+    from models.registry import registry
+    # Load (but don't run) the models here; each worker warms up after the fork
+    registry.load()
+    gc.collect()
+    # Move everything loaded so far out of the GC's reach: collections in the workers
+    # would otherwise write to these objects' headers and un-share their pages
+    gc.freeze()
+    logger.info("App loaded in parent process",
+                load_time=round(time.time() - start_time, 3),
+                rss_mb=to_mb(rss_bytes()),
+                frozen_objects=gc.get_freeze_count())
+    return app
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, index: int, threads: int):
+    import torch
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    torch.set_num_threads(threads)
+
+    logger.info("Worker started", worker=index, pid=os.getpid(), torch_threads=threads)
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="on"))
+    server.run(sockets=[sock])
+
+def log_memory(workers: dict):
+    report = memory_report([os.getpid()] + list(workers))
+    per_worker = {workers.get(pid, "parent"): usage for pid, usage in report["processes"].items()}
+    logger.info("Memory usage", processes=per_worker, total_mb=report["total_mb"])
+
+def main():
+    args = parse_args()
+    app = load_app()
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info("Listening", host=args.host, port=args.port, workers=args.workers,
+                threads_per_worker=args.threads_per_worker)
+
+    workers = {}  # pid -> worker index
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(app, sock, index, args.threads_per_worker)
+            finally:
+                os._exit(0)
+        workers[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        logger.info("Stopping workers", signal=signal.Signals(signum).name)
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for index in range(args.workers):
+        spawn(index)
+
+    # First report once the workers have warmed up, then periodically
+    next_report = time.monotonic() + min(10.0, args.memory_report_interval)
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        if pid == 0:
+            if args.memory_report_interval > 0 and time.monotonic() >= next_report:
+                log_memory(workers)
+                next_report = time.monotonic() + args.memory_report_interval
+            time.sleep(0.5)
+            continue
+
+        index = workers.pop(pid)
+        if not stopping:
+            logger.warning("Worker exited, restarting", worker=index, pid=pid,
+                           exit_code=os.waitstatus_to_exitcode(status))
+            spawn(index)
+
+    sock.close()
+    logger.info("All workers stopped")
+
+if __name__ == "__main__":
+    main()
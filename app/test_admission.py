@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the admission controller: limits, rejections and round-robin fairness
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+async def _settle():
+    # Let granted waiters resume
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_concurrency_then_queues():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=2, max_queue=4, per_user_concurrency=2, per_user_queue=4)
+        assert await controller.acquire("a") == "a"
+        assert await controller.acquire("b") == "b"
+        waiter = asyncio.ensure_future(controller.acquire("c"))
+        await _settle()
+        assert not waiter.done() and controller.queued == 1
+
+        controller.release("a")
+        await _settle()
+        assert waiter.done() and controller.running == 2 and controller.queued == 0
+    asyncio.run(run())
+
+
+def test_rejects_when_queue_or_user_queue_is_full():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=2, per_user_concurrency=1, per_user_queue=1)
+        await controller.acquire("a")
+        queued = asyncio.ensure_future(controller.acquire("a"))
+        await _settle()
+
+        try:
+            await controller.acquire("a")
+            assert False, "expected user_queue_full"
+        except AdmissionRejected as e:
+            assert e.reason == "user_queue_full" and e.retry_after >= 1
+
+        other = asyncio.ensure_future(controller.acquire("b"))
+        await _settle()
+        try:
+            await controller.acquire("c")
+            assert False, "expected queue_full"
+        except AdmissionRejected as e:
+            assert e.reason == "queue_full"
+        assert controller.rejected == 2
+        for task in (queued, other):
+            task.cancel()
+        await _settle()
+        assert controller.queued == 0
+    asyncio.run(run())
+
+
+def test_may_reject_false_queues_past_the_limits():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=0, per_user_concurrency=1, per_user_queue=0)
+        await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("a", may_reject=False))
+        await _settle()
+        assert not waiter.done() and controller.queued == 1
+
+        controller.release("a")
+        await _settle()
+        assert waiter.done() and controller.rejected == 0
+    asyncio.run(run())
+
+
+def test_freed_slots_go_round_robin_across_users():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=10, per_user_concurrency=1, per_user_queue=10)
+        await controller.acquire("busy")
+        order = []
+
+        async def request(user: str):
+            await controller.acquire(user)
+            order.append(user)
+
+        # One user floods the queue before another user arrives
+        tasks = [asyncio.ensure_future(request("a")) for _ in range(3)]
+        await _settle()
+        tasks.append(asyncio.ensure_future(request("b")))
+        await _settle()
+
+        controller.release("busy")
+        for _ in range(4):
+            await _settle()
+            controller.release(order[-1])
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "a", "a"]
+    asyncio.run(run())
+
+
+def test_per_user_concurrency_lets_other_users_run():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=4, max_queue=10, per_user_concurrency=1, per_user_queue=10)
+        await controller.acquire("a")
+        second_a = asyncio.ensure_future(controller.acquire("a"))
+        await _settle()
+        assert not second_a.done()
+
+        # "a" is at its own limit, but "b" still finds a free slot
+        assert await asyncio.wait_for(controller.acquire("b"), 1) == "b"
+        controller.release("a")
+        await _settle()
+        assert second_a.done()
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        controller = AdmissionController("t", max_concurrency=1, max_queue=10, per_user_concurrency=1, per_user_queue=10)
+        await controller.acquire("a")
+        waiter = asyncio.ensure_future(controller.acquire("b"))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        assert controller.queued == 0 and controller.stats()["users_waiting"] == 0
+
+        controller.release("a")
+        assert controller.running == 0
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
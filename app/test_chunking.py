@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for sentence chunk planning and token-budget batch packing
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.chunking import Chunk, pack_batches, plan_chunks
+
+
+def _check_ownership(chunks, sentence_count):
+    # Every sentence is owned by exactly one chunk, in order
+    assert chunks[0].start == 0 and chunks[-1].end == sentence_count
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start == previous.end
+    for chunk in chunks:
+        assert chunk.first <= chunk.start < chunk.end
+
+
+def test_chunks_fill_the_budget():
+    counts = [40, 40, 40, 40, 40]
+    chunks = plan_chunks(counts, 100)
+    assert chunks == [Chunk(0, 0, 2, 80), Chunk(2, 2, 4, 80), Chunk(4, 4, 5, 40)]
+    _check_ownership(chunks, len(counts))
+
+
+def test_oversized_sentence_gets_its_own_chunk():
+    counts = [10, 500, 10]
+    chunks = plan_chunks(counts, 100)
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, 1), (1, 2), (2, 3)]
+    assert chunks[1].tokens == 500
+
+
+def test_overlap_adds_context_within_the_budget():
+    counts = [30, 30, 30, 30, 30, 30]
+    chunks = plan_chunks(counts, 100, overlap=1)
+    _check_ownership(chunks, len(counts))
+    for chunk in chunks:
+        assert chunk.tokens == sum(counts[chunk.first:chunk.end]) <= 100
+        assert chunk.start - chunk.first <= 1
+    assert chunks[0].first == 0 and all(chunk.first == chunk.start - 1 for chunk in chunks[1:])
+
+
+def test_overlap_is_dropped_when_it_does_not_fit():
+    counts = [60, 60]
+    chunks = plan_chunks(counts, 100, overlap=2)
+    assert chunks == [Chunk(0, 0, 1, 60), Chunk(1, 1, 2, 60)]
+
+
+def test_empty_input():
+    assert plan_chunks([], 100) == []
+    assert pack_batches([], 100, 4) == []
+
+
+def test_batches_respect_padded_budget_and_size():
+    counts = [5, 50, 10, 45, 12, 8, 30]
+    batches = pack_batches(counts, 100, 3)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(counts)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(counts[i] for i in batch) <= 100
+        # Sorted by length, so neighbours pad to similar sizes
+        assert [counts[i] for i in batch] == sorted(counts[i] for i in batch)
+
+
+def test_input_over_budget_is_batched_alone():
+    batches = pack_batches([10, 300, 10], 100, 8)
+    assert [1] in batches and sum(len(batch) for batch in batches) == 3
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
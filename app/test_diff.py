@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for token-level diffing, offset mapping and sentence projection
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import utils.diff as diff
+from utils.diff import (diff_original_with_corrected, diff_tokens, map_offset, project_onto_spans,
+                        shift_onto_paragraph)
+from utils.segmentation import SentenceSpan
+
+
+def _apply(original: str, changes: list) -> str:
+    """Rebuild the corrected text from changes (resolutions are stripped, so single-space texts only)"""
+    out, cursor = [], 0
+    for change in changes:
+        out.append(original[cursor:change["startIndex"]])
+        out.append(change["resolution"])
+        cursor = change["endIndex"]
+    out.append(original[cursor:])
+    return "".join(out)
+
+
+def _sides(diffs: list):
+    return "".join(text for op, text in diffs if op != 1), "".join(text for op, text in diffs if op != -1)
+
+
+def test_identical_texts_have_no_changes():
+    assert diff_original_with_corrected("She goes home.", "She goes home.") == []
+
+
+def test_replacement_covers_whole_words():
+    original = "She go to the store."
+    changes = diff_original_with_corrected(original, "She goes to the store.")
+    assert changes == [{"startIndex": 4, "endIndex": 6, "resolution": "goes"}]
+    assert original[4:6] == "go"
+
+
+def test_insertion_is_zero_width_and_deletion_covers_the_text():
+    changes = diff_original_with_corrected("I have cat.", "I have a cat.")
+    assert len(changes) == 1 and changes[0]["startIndex"] == changes[0]["endIndex"]
+    assert changes[0]["resolution"] == "a"
+
+    original = "It is is fine."
+    changes = diff_original_with_corrected(original, "It is fine.")
+    assert [c["resolution"] for c in changes] == [""]
+    assert _apply(original, changes).split() == "It is fine.".split()
+
+
+def test_diff_tokens_reproduces_both_texts():
+    original, corrected = "Hello, world! How are you?", "Hello world. How are you doing?"
+    assert _sides(diff_tokens(original, corrected)) == (original, corrected)
+
+
+def test_many_distinct_tokens_skip_the_surrogate_block():
+    words = [f"w{i}" for i in range(60000)]
+    original = " ".join(words)
+    corrected = " ".join("CHANGED" if i == 58000 else word for i, word in enumerate(words))
+
+    chars1, chars2, _ = diff._tokens_to_chars(original, corrected)
+    assert not any(0xD800 <= ord(ch) <= 0xDFFF for ch in chars1 + chars2)
+    (chars1 + chars2).encode("utf-8")  # Lone surrogates would raise here
+
+    changes = diff_original_with_corrected(original, corrected)
+    assert len(changes) == 1 and changes[0]["resolution"] == "CHANGED"
+    assert original[changes[0]["startIndex"]:changes[0]["endIndex"]] == "w58000"
+
+
+def test_falls_back_to_characters_when_tokens_run_out():
+    limit = diff._MAX_TOKENS
+    diff._MAX_TOKENS = 3
+    try:
+        original, corrected = "a b c d e", "a b c x e"
+        diffs = diff_tokens(original, corrected)
+        assert _sides(diffs) == (original, corrected)
+    finally:
+        diff._MAX_TOKENS = limit
+
+
+def test_map_offset_follows_edits():
+    original, corrected = "She go home. He run fast.", "She goes home. He runs fast."
+    assert map_offset(original, corrected, 0) == 0
+    assert corrected[map_offset(original, corrected, original.index("He")):].startswith("He")
+    assert map_offset(original, corrected, len(original)) == len(corrected)
+
+
+def test_project_and_shift_are_inverse():
+    text = "She go home. He have a cat."
+    spans = [SentenceSpan(0, 12, text[:12]), SentenceSpan(13, 27, text[13:])]
+    changes = diff_original_with_corrected(text, "She goes home. He has a cat.")
+
+    per_sentence = project_onto_spans(changes, spans)
+    assert [len(sentence) for sentence in per_sentence] == [1, 1]
+    assert per_sentence[1][0]["startIndex"] == spans[1].text.index("have")
+    assert shift_onto_paragraph(per_sentence, spans) == changes
+
+
+def test_project_clips_changes_to_their_sentence():
+    spans = [SentenceSpan(0, 5, "Aaaa."), SentenceSpan(6, 11, "Bbbb.")]
+    change = {"startIndex": 3, "endIndex": 9, "resolution": "x"}
+    assert project_onto_spans([change], spans) == [[{"startIndex": 3, "endIndex": 5, "resolution": "x"}], []]
+    # An insertion in the gap after a sentence belongs to that sentence
+    insertion = {"startIndex": 5, "endIndex": 5, "resolution": "y"}
+    assert project_onto_spans([insertion], spans)[0] == [{"startIndex": 5, "endIndex": 5, "resolution": "y"}]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
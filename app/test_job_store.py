@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite job store: claiming, leases, recovery and retention
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.job_store import JobStore
+
+
+def _store(directory: str) -> JobStore:
+    return JobStore(os.path.join(directory, "jobs.sqlite3"))
+
+
+def _set(store: JobStore, job_id: str, **columns):
+    assignments = ", ".join(f"{name} = ?" for name in columns)
+    store._connection().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+
+
+def test_claims_oldest_first_and_only_once():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        first = store.create("grammar", {"text": "a"}, "u")
+        second = store.create("grammar", {"text": "b"}, "u")
+
+        claimed = store.claim()
+        assert claimed["id"] == first["id"] and claimed["status"] == "running"
+        assert claimed["attempts"] == 1 and claimed["heartbeat_at"] is not None
+        assert store.claim()["id"] == second["id"]
+        assert store.claim() is None
+
+
+def test_succeed_and_progress_round_trip_json():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {"text": "a"}, "u")
+        store.claim()
+        store.set_progress(job["id"], {"stage": "explaining", "completed": 1})
+        assert store.get(job["id"])["progress"] == {"stage": "explaining", "completed": 1}
+
+        store.succeed(job["id"], {"corrected": "A"}, {"stage": "done"})
+        done = store.get(job["id"])
+        assert done["status"] == "succeeded" and done["result"] == {"corrected": "A"}
+        assert done["payload"] == {"text": "a"}
+
+
+def test_queued_counts_are_per_owner():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        for owner in ("a", "a", "b", None):
+            store.create("grammar", {}, owner)
+        assert store.queued_count() == 4
+        assert store.queued_count_for("a") == 2
+        assert store.queued_count_for(None) == 1
+
+
+def test_fresh_lease_is_kept_even_for_a_foreign_worker():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {}, "u")
+        # Claimed by a process we can't probe (another host, or a recycled pid)
+        _set(store, job["id"], status="running", worker="1:elsewhere", attempts=1, heartbeat_at=time.time())
+        assert store.recover(max_attempts=3, lease_seconds=60) == []
+        assert store.get(job["id"])["status"] == "running"
+
+
+def test_expired_lease_is_requeued_then_failed_after_max_attempts():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {}, "u")
+        stale = time.time() - 120
+        _set(store, job["id"], status="running", worker="1:gone", attempts=1, heartbeat_at=stale)
+        assert store.recover(max_attempts=2, lease_seconds=60) == [job["id"]]
+        requeued = store.get(job["id"])
+        assert requeued["status"] == "queued" and requeued["worker"] is None
+
+        _set(store, job["id"], status="running", worker="1:gone", attempts=2, heartbeat_at=stale)
+        assert store.recover(max_attempts=2, lease_seconds=60) == [job["id"]]
+        failed = store.get(job["id"])
+        assert failed["status"] == "failed" and "2 attempts" in failed["error"]
+
+
+def test_heartbeat_keeps_own_jobs_alive():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {}, "u")
+        store.claim()
+        _set(store, job["id"], heartbeat_at=time.time() - 120)
+        assert store.heartbeat([job["id"]]) == 1
+        assert store.recover(max_attempts=3, lease_seconds=60) == []
+        assert store.heartbeat([]) == 0
+
+
+def test_updates_after_losing_the_lease_are_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {}, "u")
+        store.claim()
+        # Recovered and claimed by another process meanwhile
+        _set(store, job["id"], worker="1:other")
+
+        assert store.heartbeat([job["id"]]) == 0
+        store.succeed(job["id"], {"late": True})
+        store.fail(job["id"], "late")
+        store.requeue(job["id"])
+        current = store.get(job["id"])
+        assert current["status"] == "running" and current["result"] is None and current["error"] is None
+
+
+def test_requeue_does_not_count_the_attempt():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        job = store.create("grammar", {}, "u")
+        store.claim()
+        store.requeue(job["id"])
+        requeued = store.get(job["id"])
+        assert requeued["status"] == "queued" and requeued["attempts"] == 0 and requeued["heartbeat_at"] is None
+
+
+def test_purge_deletes_only_old_finished_jobs():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        old = store.create("grammar", {}, "u")
+        recent = store.create("grammar", {}, "u")
+        queued = store.create("grammar", {}, "u")
+        _set(store, old["id"], status="succeeded", finished_at=time.time() - 1000)
+        _set(store, recent["id"], status="failed", finished_at=time.time())
+
+        assert store.purge(older_than_seconds=100) == 1
+        assert store.get(old["id"]) is None
+        assert store.get(recent["id"]) is not None and store.get(queued["id"]) is not None
+
+
+def test_store_created_before_leases_gains_the_column():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jobs.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, owner TEXT,"
+            " payload TEXT NOT NULL, progress TEXT, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)")
+        conn.commit()
+        conn.close()
+
+        store = JobStore(path)
+        job = store.create("grammar", {}, "u")
+        assert store.claim()["id"] == job["id"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the lenient JSON repair and the incremental object parser
+"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.json_stream import IncrementalJSONObjectParser, loads_lenient, repair_json
+
+
+def _feed_by_char(parser: IncrementalJSONObjectParser, text: str) -> list:
+    objects = []
+    for ch in text:
+        objects.extend(parser.feed(ch))
+    return objects
+
+
+def test_repair_drops_trailing_commas():
+    assert json.loads(repair_json('{"a": [1, 2, ], "b": {"c": 3,},}')) == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_repair_inserts_missing_commas():
+    text = '{"title": "x"\n "body": "y"\n "tags": ["a" "b"] "n": 1}'
+    assert json.loads(repair_json(text)) == {"title": "x", "body": "y", "tags": ["a", "b"], "n": 1}
+
+
+def test_repair_leaves_string_contents_alone():
+    text = '{"text": "a, ] } \\"quoted\\" [,"}'
+    assert repair_json(text) == text
+    assert loads_lenient(text) == {"text": 'a, ] } "quoted" [,'}
+
+
+def test_loads_lenient_still_raises_on_garbage():
+    try:
+        loads_lenient('{"a": ')
+        assert False, "expected JSONDecodeError"
+    except json.JSONDecodeError:
+        pass
+
+
+def test_parser_emits_objects_of_a_bare_array_as_they_complete():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': 2},') == [{"b": 2}]
+    assert parser.feed(']') == []
+    assert parser.objects_parsed == 2
+
+
+def test_parser_handles_wrapped_arrays_and_nested_objects():
+    text = '{"insights": [{"a": {"nested": [1, {"x": "}"}]}}, {"b": "[{"}]}'
+    parser = IncrementalJSONObjectParser()
+    assert _feed_by_char(parser, text) == [{"a": {"nested": [1, {"x": "}"}]}}, {"b": "[{"}]
+
+
+def test_parser_repairs_and_skips_objects():
+    parser = IncrementalJSONObjectParser()
+    objects = _feed_by_char(parser, '[{"a": 1,}, {"b": }, {"c": 3\n "d": 4}]')
+    assert objects == [{"a": 1}, {"c": 3, "d": 4}]
+    assert parser.objects_parsed == 2 and parser.objects_skipped == 1
+
+
+def test_parser_never_emits_a_truncated_object():
+    parser = IncrementalJSONObjectParser()
+    objects = _feed_by_char(parser, '[{"a": 1}, {"b": "cut off mid str')
+    assert objects == [{"a": 1}]
+    assert parser.objects_skipped == 0
+
+
+def test_parser_escaped_quotes_do_not_end_strings():
+    parser = IncrementalJSONObjectParser()
+    assert _feed_by_char(parser, '[{"q": "say \\"}\\" twice"}]') == [{"q": 'say "}" twice'}]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for SingleFlight: coalescing, failure propagation and cancellation
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.single_flight import SingleFlight
+
+
+def test_identical_concurrent_calls_run_once():
+    async def run():
+        flight = SingleFlight("t")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        assert results == ["done"] * 5 and len(calls) == 1
+        stats = flight.stats()
+        assert stats["executions"] == 1 and stats["coalesced"] == 4 and stats["in_flight"] == 0
+    asyncio.run(run())
+
+
+def test_different_keys_and_later_calls_run_again():
+    async def run():
+        flight = SingleFlight("t")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            number = len(calls)
+            await asyncio.sleep(0)
+            return number
+
+        assert sorted(await asyncio.gather(flight.do("a", work), flight.do("b", work))) == [1, 2]
+        assert await flight.do("a", work) == 3
+    asyncio.run(run())
+
+
+def test_leader_failure_reaches_every_caller():
+    async def run():
+        flight = SingleFlight("t")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+        # The failure is not cached
+        async def ok():
+            return "ok"
+        assert await flight.do("k", ok) == "ok"
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_the_work():
+    async def run():
+        flight = SingleFlight("t")
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            finished.set()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        assert flight.in_flight("k")
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done" and finished.is_set()
+        assert not flight.in_flight("k")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
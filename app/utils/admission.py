@@ -0,0 +1,175 @@
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+from utils.logger import get_logger
+import asyncio
+import math
+import time
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't be queued; the route turns it into a 429"""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Server busy ({reason}), retry after {retry_after}s")
+
+
+class _Waiter:
+    __slots__ = ("user", "future", "enqueued_at")
+
+    def __init__(self, user: str, future: asyncio.Future):
+        self.user = user
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Bounded, per-user fair work queue in front of expensive routes.
+
+    At most ``max_concurrency`` requests run at once and each user (JWT
+    ``sub``) at most ``per_user_concurrency`` of them. Requests beyond that
+    wait in a per-user queue; freed slots are handed out round-robin across
+    users, so one client with many large documents can't push everyone
+    else's latency up. When the total queue holds ``max_queue`` requests (or
+    a user's own queue holds ``per_user_queue``) new requests are rejected
+    right away with an estimated retry delay.
+
+    Lives on the event loop: all methods must be called from coroutines.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, max_queue: int = 64,
+                 per_user_concurrency: int = 2, per_user_queue: int = 8):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.per_user_concurrency = max(1, per_user_concurrency)
+        self.per_user_queue = max(0, per_user_queue)
+        self.logger = get_logger(f"admission.{name}")
+
+        self._running: Dict[str, int] = {}
+        # Users with waiting requests, in round-robin order
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.running = 0
+        self.queued = 0
+
+        # Moving average of how long a slot is held, for Retry-After
+        self._service_time = 1.0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.max_queued = 0
+        self.waited = 0
+        self.total_queue_wait = 0.0
+
+    def _can_run(self, user: str) -> bool:
+        return self.running < self.max_concurrency and self._running.get(user, 0) < self.per_user_concurrency
+
+    def _retry_after(self) -> int:
+        # Time for the slots to work through everything already queued
+        return max(1, math.ceil(self._service_time * (self.queued + 1) / self.max_concurrency))
+
+    def _start(self, user: str):
+        self.running += 1
+        self._running[user] = self._running.get(user, 0) + 1
+        self.admitted += 1
+
+    async def acquire(self, user: Optional[str], may_reject: bool = True) -> str:
+        """
+        Wait for a slot for ``user``; returns the key to pass to release().
+
+        With ``may_reject=False`` the request is queued even past the queue
+        limits, for work that was already admitted and continues in steps.
+        """
+        user = user or "anonymous"
+        # Queued users go first, otherwise a burst from one user could overtake them
+        if not self._queues and self._can_run(user):
+            self._start(user)
+            return user
+
+        user_queue = self._queues.get(user)
+        if may_reject and self.queued >= self.max_queue:
+            self._reject("queue_full", user)
+        if may_reject and (len(user_queue) if user_queue else 0) >= self.per_user_queue:
+            self._reject("user_queue_full", user)
+
+        waiter = _Waiter(user, asyncio.get_running_loop().create_future())
+        if user_queue is None:
+            user_queue = self._queues[user] = deque()
+        user_queue.append(waiter)
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        # A slot may already be free for this user (others are only capped by their own limit)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted a slot just as the caller went away: hand it back
+                self.release(user)
+            else:
+                self._remove(waiter)
+            raise
+        self.waited += 1
+        self.total_queue_wait += time.monotonic() - waiter.enqueued_at
+        return user
+
+    def release(self, user: str, service_time: Optional[float] = None):
+        """Free a slot and hand it to the next user in round-robin order"""
+        self.running -= 1
+        remaining = self._running.get(user, 1) - 1
+        if remaining:
+            self._running[user] = remaining
+        else:
+            self._running.pop(user, None)
+        if service_time is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self._dispatch()
+
+    def _dispatch(self):
+        # One pass over the users in queue order; each served user moves to the back
+        for user in list(self._queues):
+            if self.running >= self.max_concurrency:
+                return
+            if not self._can_run(user):
+                continue
+            user_queue = self._queues.pop(user)
+            waiter = user_queue.popleft()
+            self.queued -= 1
+            if user_queue:
+                self._queues[user] = user_queue
+            self._start(user)
+            waiter.future.set_result(None)
+
+    def _remove(self, waiter: _Waiter):
+        user_queue = self._queues.get(waiter.user)
+        if user_queue is not None and waiter in user_queue:
+            user_queue.remove(waiter)
+            self.queued -= 1
+            if not user_queue:
+                del self._queues[waiter.user]
+
+    def _reject(self, reason: str, user: str):
+        self.rejected += 1
+        retry_after = self._retry_after()
+        self.logger.warning("Request rejected by admission control", reason=reason, user=user,
+                            queued=self.queued, running=self.running, retry_after=retry_after)
+        raise AdmissionRejected(reason, retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "users_waiting": len(self._queues),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "max_queued": self.max_queued,
+            "avg_queue_wait": round(self.total_queue_wait / self.waited, 3) if self.waited else 0.0,
+            "avg_service_time": round(self._service_time, 3),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "per_user_concurrency": self.per_user_concurrency,
+            "per_user_queue": self.per_user_queue,
+        }
@@ -0,0 +1,58 @@
+from typing import List, NamedTuple, Sequence
+
+
+class Chunk(NamedTuple):
+    first: int  # First sentence fed to the model (overlap context included)
+    start: int  # First sentence the chunk owns, i.e. whose correction is kept
+    end: int  # One past the last sentence
+    tokens: int  # Input tokens, context included
+
+
+def plan_chunks(token_counts: Sequence[int], max_tokens: int, overlap: int = 0) -> List[Chunk]:
+    """
+    Group consecutive sentences into chunks of at most ``max_tokens`` tokens.
+
+    Every sentence is owned by exactly one chunk. With ``overlap`` > 0 each
+    chunk is also given up to that many preceding sentences as context, as long
+    as they fit the budget. A sentence longer than the budget gets a chunk of
+    its own.
+    """
+    chunks = []
+    start = 0
+    while start < len(token_counts):
+        first, tokens = start, 0
+        # Context only if at least the first owned sentence still fits after it
+        while (first > 0 and start - first < overlap
+               and tokens + token_counts[first - 1] + token_counts[start] <= max_tokens):
+            first -= 1
+            tokens += token_counts[first]
+        end = start + 1
+        tokens += token_counts[start]
+        while end < len(token_counts) and tokens + token_counts[end] <= max_tokens:
+            tokens += token_counts[end]
+            end += 1
+        chunks.append(Chunk(first, start, end, tokens))
+        start = end
+    return chunks
+
+
+def pack_batches(token_counts: Sequence[int], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """
+    Indices of the inputs grouped into generate() batches.
+
+    Inputs are sorted by length so each batch pads to similar lengths, and a
+    batch is closed before its padded size (inputs x longest input) would pass
+    ``max_batch_tokens`` or it would hold more than ``max_batch_size`` inputs.
+    An input longer than the budget is batched alone.
+    """
+    batches, current = [], []
+    for index in sorted(range(len(token_counts)), key=lambda i: token_counts[i]):
+        # Sorted ascending, so the new input is the longest in the batch
+        if current and ((len(current) + 1) * token_counts[index] > max_batch_tokens
+                        or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
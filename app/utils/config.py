@@ -0,0 +1,145 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file in the root directory
+load_dotenv()
+
+
+def _get_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Grammar model micro-batching
+GRAMMAR_BATCHING_ENABLED = _get_bool("GRAMMAR_BATCHING_ENABLED", True)
+GRAMMAR_BATCH_MAX_SIZE = _get_int("GRAMMAR_BATCH_MAX_SIZE", 16)
+GRAMMAR_BATCH_WINDOW_MS = _get_float("GRAMMAR_BATCH_WINDOW_MS", 10.0)
+
+# Executor pools keeping blocking work off the event loop
+OLLAMA_POOL_SIZE = _get_int("OLLAMA_POOL_SIZE", 8)
+INFERENCE_POOL_SIZE = _get_int("INFERENCE_POOL_SIZE", os.cpu_count() or 4)
+
+# "paragraph" corrects the whole text in one generate call, "sentence" splits
+# first and corrects all sentences in one batched call
+GRAMMAR_CORRECTION_MODE = os.getenv("GRAMMAR_CORRECTION_MODE", "paragraph")
+
+# Per-sentence correction cache (sentence mode); size 0 disables it
+SENTENCE_CACHE_SIZE = _get_int("SENTENCE_CACHE_SIZE", 10000)
+SENTENCE_CACHE_TTL_SECONDS = _get_float("SENTENCE_CACHE_TTL_SECONDS", 3600.0)
+
+# Disk-backed cache shared across worker processes; reads refresh an entry's LRU
+# timestamp at most once per PERSISTENT_CACHE_TOUCH_SECONDS
+PERSISTENT_CACHE_ENABLED = _get_bool("PERSISTENT_CACHE_ENABLED", True)
+PERSISTENT_CACHE_PATH = os.getenv("PERSISTENT_CACHE_PATH", ".cache/ai_gen_cache.sqlite3")
+PERSISTENT_CACHE_MAX_ENTRIES = _get_int("PERSISTENT_CACHE_MAX_ENTRIES", 200000)
+PERSISTENT_CACHE_TOUCH_SECONDS = _get_float("PERSISTENT_CACHE_TOUCH_SECONDS", 300.0)
+
+# Async Ollama client: pooled keep-alive connections and a concurrency cap
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+OLLAMA_MAX_CONCURRENCY = _get_int("OLLAMA_MAX_CONCURRENCY", 4)
+OLLAMA_TIMEOUT_SECONDS = _get_float("OLLAMA_TIMEOUT_SECONDS", 120.0)
+
+# "per_sentence" issues one Ollama call per changed sentence, "batch" packs all
+# changed sentences of a request into as few calls as the token budget allows
+EXPLANATION_MODE = os.getenv("EXPLANATION_MODE", "per_sentence")
+EXPLANATION_BATCH_TOKEN_BUDGET = _get_int("EXPLANATION_BATCH_TOKEN_BUDGET", 1500)
+
+# Schema-constrained Ollama output (format=<JSON schema>); disable for Ollama
+# servers older than 0.5 that only understand format="json"
+STRUCTURED_OUTPUT_ENABLED = _get_bool("STRUCTURED_OUTPUT_ENABLED", True)
+STRUCTURED_OUTPUT_MAX_RETRIES = _get_int("STRUCTURED_OUTPUT_MAX_RETRIES", 1)
+
+# In-memory insights result cache
+INSIGHTS_CACHE_SIZE = _get_int("INSIGHTS_CACHE_SIZE", 1000)
+INSIGHTS_CACHE_TTL_SECONDS = _get_float("INSIGHTS_CACHE_TTL_SECONDS", 900.0)
+INSIGHTS_CACHE_MAX_BYTES = _get_int("INSIGHTS_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+# Grammar model execution backend: "torch" or "onnx" (needs optimum[onnxruntime])
+GRAMMAR_BACKEND = os.getenv("GRAMMAR_BACKEND", "torch")
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", ".models/grammar_corrector_onnx")
+# Dynamic int8 quantisation of the torch backend (CPU only); check with benchmark_quantization.py
+GRAMMAR_QUANTIZE = _get_bool("GRAMMAR_QUANTIZE", False)
+
+# Grammar decoding: "beam" (num_beams=2), "greedy", or "speculative" (greedy
+# output, drafting tokens copied from the input; torch backend only)
+GRAMMAR_DECODING = os.getenv("GRAMMAR_DECODING", "beam")
+SPECULATIVE_DRAFT_TOKENS = _get_int("SPECULATIVE_DRAFT_TOKENS", 10)
+SPECULATIVE_NGRAM_SIZE = _get_int("SPECULATIVE_NGRAM_SIZE", 3)
+
+# Skip generation for inputs the model would copy unchanged: minimum per-token
+# copy probability above which an input counts as already correct (0 disables).
+# Pick a value with evaluate_prefilter.py
+GRAMMAR_PREFILTER_THRESHOLD = _get_float("GRAMMAR_PREFILTER_THRESHOLD", 0.0)
+
+# Load-adaptive decoding: max_length follows the input token count, and beam
+# search drops to greedy while too many generations are in flight or the p95
+# generation latency is above the threshold (0 disables the latency check)
+ADAPTIVE_DECODING_ENABLED = _get_bool("ADAPTIVE_DECODING_ENABLED", True)
+DECODING_DEGRADE_IN_FLIGHT = _get_int("DECODING_DEGRADE_IN_FLIGHT", 8)
+DECODING_DEGRADE_P95_SECONDS = _get_float("DECODING_DEGRADE_P95_SECONDS", 2.0)
+DECODING_LATENCY_WINDOW = _get_int("DECODING_LATENCY_WINDOW", 200)
+DECODING_LATENCY_HORIZON_SECONDS = _get_float("DECODING_LATENCY_HORIZON_SECONDS", 60.0)
+GRAMMAR_MAX_LENGTH_RATIO = _get_float("GRAMMAR_MAX_LENGTH_RATIO", 1.3)
+GRAMMAR_MAX_LENGTH_MARGIN = _get_int("GRAMMAR_MAX_LENGTH_MARGIN", 8)
+GRAMMAR_MAX_LENGTH_CAP = _get_int("GRAMMAR_MAX_LENGTH_CAP", 512)
+
+# Admission control in front of the grammar and insights routes: concurrent
+# requests per route, total and per-user waiting requests (beyond that: 429),
+# and concurrent requests per JWT subject
+ADMISSION_ENABLED = _get_bool("ADMISSION_ENABLED", True)
+GRAMMAR_ADMISSION_CONCURRENCY = _get_int("GRAMMAR_ADMISSION_CONCURRENCY", 8)
+INSIGHTS_ADMISSION_CONCURRENCY = _get_int("INSIGHTS_ADMISSION_CONCURRENCY", 8)
+ADMISSION_MAX_QUEUE = _get_int("ADMISSION_MAX_QUEUE", 64)
+ADMISSION_PER_USER_CONCURRENCY = _get_int("ADMISSION_PER_USER_CONCURRENCY", 2)
+ADMISSION_PER_USER_QUEUE = _get_int("ADMISSION_PER_USER_QUEUE", 8)
+
+# Startup: "background" loads models in a thread after the server starts (requests
+# get 503 until /ready passes), "eager" blocks startup until loaded, "lazy" loads on
+# the first request. Artifacts come from local files only unless downloads are allowed
+MODEL_LOADING = os.getenv("MODEL_LOADING", "background")
+MODEL_DOWNLOAD_ALLOWED = _get_bool("MODEL_DOWNLOAD_ALLOWED", False)
+GRAMMAR_MODEL_NAME = os.getenv("GRAMMAR_MODEL_NAME", "deep-learning-analytics/GrammarCorrector")
+NLTK_DATA_DIR = os.getenv("NLTK_DATA_DIR", ".models/nltk_data")
+MODEL_WARMUP_ENABLED = _get_bool("MODEL_WARMUP_ENABLED", True)
+
+# Upper bound on one document diff; past it diff_match_patch returns a coarser (still valid) diff
+DIFF_TIMEOUT_SECONDS = _get_float("DIFF_TIMEOUT_SECONDS", 1.0)
+
+# Bulk grammar endpoint: documents per request and sentences per shared chunk
+GRAMMAR_BULK_MAX_DOCUMENTS = _get_int("GRAMMAR_BULK_MAX_DOCUMENTS", 1000)
+GRAMMAR_BULK_CHUNK_SENTENCES = _get_int("GRAMMAR_BULK_CHUNK_SENTENCES", 128)
+
+# Job API: durable SQLite queue worked by JOB_WORKERS in-process workers; running
+# jobs hold a lease renewed every JOB_MAINTENANCE_SECONDS, and jobs whose lease is
+# older than JOB_LEASE_SECONDS are requeued (up to JOB_MAX_ATTEMPTS claims), finished
+# jobs are kept for JOB_RETENTION_SECONDS, submissions beyond JOB_MAX_QUEUED (or
+# JOB_MAX_QUEUED_PER_USER queued jobs of the same JWT subject) get 429
+JOBS_ENABLED = _get_bool("JOBS_ENABLED", True)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", ".cache/jobs.sqlite3")
+JOB_WORKERS = _get_int("JOB_WORKERS", 2)
+JOB_POLL_SECONDS = _get_float("JOB_POLL_SECONDS", 1.0)
+JOB_MAX_ATTEMPTS = _get_int("JOB_MAX_ATTEMPTS", 3)
+JOB_MAX_QUEUED = _get_int("JOB_MAX_QUEUED", 1000)
+JOB_MAX_QUEUED_PER_USER = _get_int("JOB_MAX_QUEUED_PER_USER", 50)
+JOB_RETENTION_SECONDS = _get_float("JOB_RETENTION_SECONDS", 86400.0)
+JOB_MAINTENANCE_SECONDS = _get_float("JOB_MAINTENANCE_SECONDS", 10.0)
+JOB_LEASE_SECONDS = _get_float("JOB_LEASE_SECONDS", 60.0)
+
+# Long documents (paragraph mode): texts over GRAMMAR_CHUNK_MAX_TOKENS are corrected in
+# sentence-aligned chunks of that many tokens, optionally preceded by overlap sentences
+# as context, packed into generate() calls of at most GRAMMAR_CHUNK_BATCH_TOKENS padded tokens
+GRAMMAR_CHUNK_MAX_TOKENS = _get_int("GRAMMAR_CHUNK_MAX_TOKENS", 256)
+GRAMMAR_CHUNK_OVERLAP_SENTENCES = _get_int("GRAMMAR_CHUNK_OVERLAP_SENTENCES", 0)
+GRAMMAR_CHUNK_BATCH_TOKENS = _get_int("GRAMMAR_CHUNK_BATCH_TOKENS", 4096)
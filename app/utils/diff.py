@@ -1,9 +1,93 @@
 from diff_match_patch import diff_match_patch
+from typing import Dict, List, Sequence, Tuple
+from utils.segmentation import SentenceSpan
+from utils import config
+import re
+
+# Bumped whenever the shape of the changes changes, so cached diffs are not reused
+DIFF_VERSION = 2
+
+# Words, whitespace runs and single punctuation marks: every character belongs to one token
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
+_dmp = diff_match_patch()
+_dmp.Diff_Timeout = config.DIFF_TIMEOUT_SECONDS
+
+# Token codes skip the UTF-16 surrogate block, which is not valid text
+_SURROGATES_START, _SURROGATES_SIZE = 0xD800, 0x800
+_MAX_TOKENS = 0x110000 - _SURROGATES_SIZE
+
+
+def _code_to_char(code: int) -> str:
+    return chr(code if code < _SURROGATES_START else code + _SURROGATES_SIZE)
+
+
+def _char_to_code(char: str) -> int:
+    code = ord(char)
+    return code if code < _SURROGATES_START else code - _SURROGATES_SIZE
+
+
+def _tokens_to_chars(original: str, corrected: str) -> Tuple[str, str, List[str]]:
+    """
+    Encode both texts as one character per token (diff_match_patch's
+    linesToChars trick applied to words), so the diff runs over tokens.
+
+    Raises OverflowError when the texts have more distinct tokens than there
+    are code points.
+    """
+    token_array: List[str] = []
+    token_hash: Dict[str, int] = {}
+
+    def encode(text: str) -> str:
+        chars = []
+        for token in _TOKEN_RE.findall(text):
+            code = token_hash.get(token)
+            if code is None:
+                if len(token_array) >= _MAX_TOKENS:
+                    raise OverflowError("Too many distinct tokens to diff by token")
+                code = token_hash[token] = len(token_array)
+                token_array.append(token)
+            chars.append(_code_to_char(code))
+        return "".join(chars)
+
+    return encode(original), encode(corrected), token_array
+
+
+def diff_tokens(original: str, corrected: str) -> List[Tuple[int, str]]:
+    """
+    diff_match_patch-style (op, text) list computed over word/punctuation
+    tokens, or over characters when there are too many distinct tokens.
+    """
+    try:
+        chars1, chars2, token_array = _tokens_to_chars(original, corrected)
+    except OverflowError:
+        diffs = _dmp.diff_main(original, corrected, False)
+        _dmp.diff_cleanupSemantic(diffs)
+        return diffs
+    diffs = _dmp.diff_main(chars1, chars2, False)
+    _dmp.diff_cleanupSemantic(diffs)
+    return [(op, "".join(token_array[_char_to_code(char)] for char in data)) for op, data in diffs]
+
+
+def map_offset(original: str, corrected: str, offset: int) -> int:
+    """
+    Position in ``corrected`` matching ``offset`` in ``original``.
+
+    An offset inside replaced or deleted text maps to where that text was.
+    """
+    return _dmp.diff_xIndex(diff_tokens(original, corrected), offset)
+
 
 def diff_original_with_corrected(original: str, corrected: str):
-    dmp = diff_match_patch()
-    diffs = dmp.diff_main(original, corrected)
-    dmp.diff_cleanupSemantic(diffs)
+    """
+    Changes turning ``original`` into ``corrected``, indexed in ``original``.
+
+    Replacements and deletions cover the replaced text; insertions are
+    zero-width (startIndex == endIndex) with the inserted text as resolution.
+    """
+    if original == corrected:
+        return []
+    diffs = diff_tokens(original, corrected)
 
     changes = []
     offset = 0
@@ -26,10 +110,56 @@ def diff_original_with_corrected(original: str, corrected: str):
                 "endIndex": start_index + len(removed_text),
                 "resolution": resolution
             })
-        
+        elif op == 1 and data.strip(): # pure insertion
+            changes.append({
+                "startIndex": offset,
+                "endIndex": offset,
+                "resolution": data.strip()
+            })
+
         if op != 1:
             offset += len(data)
-            
+
         i += 1
 
-    return changes
\ No newline at end of file
+    return changes
+
+
+def project_onto_spans(changes: List[dict], spans: Sequence[SentenceSpan]) -> List[List[dict]]:
+    """
+    Split paragraph-level changes into per-sentence lists with sentence-relative indexes.
+
+    A change belongs to the sentence it starts in (an insertion right after a
+    sentence belongs to that sentence) and is clipped to the sentence's end.
+    Both lists are sorted, so this is a single merge pass.
+    """
+    per_sentence: List[List[dict]] = [[] for _ in spans]
+    if not spans:
+        return per_sentence
+
+    index = 0
+    for change in changes:
+        start = change["startIndex"]
+        # Move on while the change starts beyond this sentence (or in the gap after it)
+        while index + 1 < len(spans) and start >= spans[index + 1].start:
+            index += 1
+        span = spans[index]
+        per_sentence[index].append({
+            "startIndex": max(0, start - span.start),
+            "endIndex": max(0, min(change["endIndex"], span.end) - span.start),
+            "resolution": change["resolution"]
+        })
+    return per_sentence
+
+
+def shift_onto_paragraph(per_sentence: List[List[dict]], spans: Sequence[SentenceSpan]) -> List[dict]:
+    """Inverse of project_onto_spans: sentence-relative changes to paragraph indexes"""
+    changes = []
+    for sentence_changes, span in zip(per_sentence, spans):
+        for change in sentence_changes:
+            changes.append({
+                "startIndex": change["startIndex"] + span.start,
+                "endIndex": change["endIndex"] + span.start,
+                "resolution": change["resolution"]
+            })
+    return changes
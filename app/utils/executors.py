@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from utils.logger import get_logger
+from utils import config
+import asyncio
+import contextvars
+import functools
+import threading
+
+logger = get_logger("executors")
+
+# Ollama calls are network-bound and get a bounded I/O pool; torch/NLTK work
+# is CPU-bound and gets its own pool so slow LLM calls can't starve inference.
+_ollama_executor: Optional[ThreadPoolExecutor] = None
+_inference_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_ollama_executor() -> ThreadPoolExecutor:
+    global _ollama_executor
+    with _lock:
+        if _ollama_executor is None:
+            _ollama_executor = ThreadPoolExecutor(max_workers=config.OLLAMA_POOL_SIZE,
+                                                  thread_name_prefix="ollama-io")
+            logger.info("Ollama executor started", max_workers=config.OLLAMA_POOL_SIZE)
+        return _ollama_executor
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    global _inference_executor
+    with _lock:
+        if _inference_executor is None:
+            _inference_executor = ThreadPoolExecutor(max_workers=config.INFERENCE_POOL_SIZE,
+                                                     thread_name_prefix="inference")
+            logger.info("Inference executor started", max_workers=config.INFERENCE_POOL_SIZE)
+        return _inference_executor
+
+
+async def _run_in(executor: ThreadPoolExecutor, func: Callable[..., Any], *args, **kwargs) -> Any:
+    # Copy the caller's context so request-scoped contextvars survive the hop to the pool
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def run_in_ollama_pool(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking Ollama call on the I/O pool"""
+    return await _run_in(get_ollama_executor(), func, *args, **kwargs)
+
+
+async def run_in_inference_pool(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking model/CPU work on the inference pool"""
+    return await _run_in(get_inference_executor(), func, *args, **kwargs)
+
+
+def shutdown_executors():
+    global _ollama_executor, _inference_executor
+    with _lock:
+        for executor in (_ollama_executor, _inference_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        _ollama_executor = None
+        _inference_executor = None
+    logger.info("Executors shut down")
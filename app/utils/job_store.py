@@ -0,0 +1,235 @@
+from typing import Any, List, Optional
+from utils.logger import get_logger
+from utils import config
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = get_logger("job_store")
+
+# Identifies this process in the store; the pid alone is reused after a container restart
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+_COLUMNS = ("id", "kind", "status", "owner", "payload", "progress", "result", "error",
+            "attempts", "worker", "created_at", "started_at", "finished_at", "heartbeat_at")
+
+
+def _worker_id() -> str:
+    return f"{os.getpid()}:{_PROCESS_TOKEN}"
+
+
+class JobStore:
+    """
+    Durable job queue shared by every worker process on the host.
+
+    Jobs move from "queued" to "running" (claimed by one process) to
+    "succeeded" or "failed". Payloads, progress and results are stored as
+    JSON. Like PersistentCache it is SQLite in WAL mode with a connection per
+    thread and process; claims run in an immediate transaction, so two
+    workers never take the same job.
+
+    A claim is a lease: the claiming process refreshes ``heartbeat_at`` for
+    its running jobs, and a job whose heartbeat is older than the lease is
+    taken to belong to a dead process. Unlike probing the claimer's pid, this
+    is not fooled by a recycled pid and works across hosts. Updates from a
+    process whose lease was taken away are ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " owner TEXT,"
+                " payload TEXT NOT NULL,"
+                " progress TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " heartbeat_at REAL)"
+            )
+            # Stores created before leases existed
+            if "heartbeat_at" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner_status ON jobs (owner, status)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        for name in ("payload", "progress", "result"):
+            if job[name] is not None:
+                job[name] = json.loads(job[name])
+        return job
+
+    def create(self, kind: str, payload: dict, owner: Optional[str]) -> dict:
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO jobs (id, kind, status, owner, payload, progress, created_at) VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, owner, json.dumps(payload), json.dumps({"stage": "queued"}), time.time())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def queued_count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def queued_count_for(self, owner: Optional[str]) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND owner IS ?", (owner,)).fetchone()[0]
+
+    def claim(self) -> Optional[dict]:
+        """Take the oldest queued job for this process, or None"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (_worker_id(), now, now, row[0])
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0])
+
+    # Updates to a running job only apply while this process still holds its lease
+
+    def set_progress(self, job_id: str, progress: dict):
+        self._connection().execute(
+            "UPDATE jobs SET progress = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (json.dumps(progress), job_id, _worker_id()))
+
+    def heartbeat(self, job_ids: List[str]) -> int:
+        """Renew this process's lease on its running jobs; returns how many it still holds"""
+        if not job_ids:
+            return 0
+        cursor = self._connection().execute(
+            f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND worker = ?"
+            f" AND id IN ({', '.join('?' * len(job_ids))})",
+            (time.time(), _worker_id(), *job_ids)
+        )
+        return cursor.rowcount
+
+    def succeed(self, job_id: str, result: Any, progress: Optional[dict] = None):
+        self._connection().execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, progress = COALESCE(?, progress), finished_at = ?"
+            " WHERE id = ? AND status = 'running' AND worker = ?",
+            (json.dumps(result), json.dumps(progress) if progress is not None else None, time.time(),
+             job_id, _worker_id())
+        )
+
+    def fail(self, job_id: str, error: str):
+        self._connection().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (error, time.time(), job_id, _worker_id())
+        )
+
+    def requeue(self, job_id: str):
+        """Hand a job this process was running back to the queue without counting the attempt"""
+        self._connection().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, heartbeat_at = NULL, attempts = MAX(attempts - 1, 0),"
+            " progress = ? WHERE id = ? AND status = 'running' AND worker = ?",
+            (json.dumps({"stage": "queued"}), job_id, _worker_id())
+        )
+
+    def recover(self, max_attempts: int, lease_seconds: float) -> List[str]:
+        """
+        Requeue running jobs whose lease expired, i.e. whose heartbeat is older
+        than ``lease_seconds`` (or fail them after ``max_attempts`` claims, so a
+        job that crashes its worker can't loop). Returns the recovered job ids.
+        """
+        conn = self._connection()
+        expired = time.time() - lease_seconds
+        rows = conn.execute(
+            "SELECT id, worker, attempts FROM jobs WHERE status = 'running' AND COALESCE(heartbeat_at, 0) < ?",
+            (expired,)
+        ).fetchall()
+        recovered = []
+        for job_id, worker, attempts in rows:
+            # Re-checked in the update, so a heartbeat that lands meanwhile keeps the job
+            stale = "id = ? AND status = 'running' AND worker IS ? AND COALESCE(heartbeat_at, 0) < ?"
+            if attempts >= max_attempts:
+                cursor = conn.execute(
+                    f"UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE {stale}",
+                    (f"Worker stopped responding while running the job ({attempts} attempts)", time.time(),
+                     job_id, worker, expired)
+                )
+            else:
+                cursor = conn.execute(
+                    f"UPDATE jobs SET status = 'queued', worker = NULL, heartbeat_at = NULL, progress = ? WHERE {stale}",
+                    (json.dumps({"stage": "queued"}), job_id, worker, expired)
+                )
+            if cursor.rowcount:
+                recovered.append(job_id)
+                logger.warning("Recovered job with expired lease", job_id=job_id, worker=worker, attempts=attempts)
+        return recovered
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Delete finished jobs older than the retention period"""
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+            (time.time() - older_than_seconds,)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        counts = dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "path": self.path,
+            **{name: counts.get(name, 0) for name in ("queued", "running", "succeeded", "failed")}
+        }
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> Optional[JobStore]:
+    """Process-wide job store, or None when the job API is disabled by config"""
+    global _store
+    if not config.JOBS_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = JobStore(config.JOB_STORE_PATH)
+            logger.info("Job store opened", path=config.JOB_STORE_PATH)
+        return _store
@@ -0,0 +1,134 @@
+from typing import Any, List, Optional
+from utils.logger import get_logger
+import json
+
+logger = get_logger("json_stream")
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the two mistakes LLMs make most often in otherwise valid JSON:
+    trailing commas before a closing bracket and missing commas between
+    adjacent values (e.g. a line break between two object fields).
+    String contents are never touched.
+    """
+    out: List[str] = []
+    in_string = False
+    escape = False
+    last = None  # last significant character outside whitespace
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                last = '"'
+            continue
+
+        if ch.isspace():
+            out.append(ch)
+            continue
+
+        if ch in "}]":
+            # Drop a trailing comma (and the whitespace after it)
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        elif ch in '"{[' and last is not None and (last in '"}]' or last.isalnum()):
+            # A new value starts right after a finished one: the comma is missing
+            out.append(",")
+
+        if ch == '"':
+            in_string = True
+        out.append(ch)
+        last = ch
+
+    return "".join(out)
+
+
+def loads_lenient(text: str) -> Any:
+    """json.loads(), retrying once on the repaired text"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text))
+
+
+class IncrementalJSONObjectParser:
+    """
+    Pull JSON objects out of a token stream as soon as they are complete.
+
+    Feed raw text chunks as they arrive; every object whose direct parent is an
+    array is parsed and returned the moment its closing brace is seen. This
+    covers both a bare ``[{...}, {...},]`` reply and a wrapped
+    ``{"insights": [{...}]}`` one. Objects that can't be parsed even after
+    repair are skipped and counted.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._object_start: Optional[int] = None
+        self._object_depth = 0
+
+        self.objects_parsed = 0
+        self.objects_skipped = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return the objects it completed"""
+        self._buffer += chunk
+        completed = []
+
+        while self._pos < len(self._buffer):
+            ch = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._object_start is None and self._stack and self._stack[-1] == "[":
+                    self._object_start = self._pos
+                    self._object_depth = len(self._stack) + 1
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._object_start is not None and len(self._stack) == self._object_depth - 1:
+                    parsed = self._parse(self._buffer[self._object_start:self._pos + 1])
+                    if parsed is not None:
+                        completed.append(parsed)
+                    self._object_start = None
+
+            self._pos += 1
+
+        # Nothing in flight: drop what has been consumed to keep the buffer small
+        if self._object_start is None:
+            self._buffer = ""
+            self._pos = 0
+
+        return completed
+
+    def _parse(self, text: str) -> Optional[Any]:
+        try:
+            parsed = loads_lenient(text)
+            self.objects_parsed += 1
+            return parsed
+        except json.JSONDecodeError as e:
+            self.objects_skipped += 1
+            logger.warning("Skipping unparseable streamed JSON object", error=str(e), raw=text[:200])
+            return None
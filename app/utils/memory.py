@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+import os
+import resource
+import sys
+
+
+def _read_status_kb(pid: int, field: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def rss_bytes(pid: Optional[int] = None) -> int:
+    """Current resident set size of a process (this one by default)"""
+    kb = _read_status_kb(pid or os.getpid(), "VmRSS")
+    if kb is not None:
+        return kb * 1024
+    # No procfs: fall back to the peak RSS of this process (bytes on macOS, KB elsewhere)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process"""
+    kb = _read_status_kb(os.getpid(), "VmHWM")
+    if kb is not None:
+        return kb * 1024
+    return rss_bytes()
+
+
+def _read_smaps_rollup_kb(pid: int) -> Dict[str, int]:
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    return fields
+
+
+def memory_breakdown(pid: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """
+    RSS split into shared and private pages for one process, in bytes.
+
+    PSS charges each shared page to its sharers proportionally, so the PSS of
+    forked workers adds up to the memory they really use together. Without
+    smaps_rollup (non-Linux, old kernels) only RSS is known.
+    """
+    pid = pid or os.getpid()
+    rollup = _read_smaps_rollup_kb(pid)
+    if not rollup:
+        return {"rss": rss_bytes(pid), "pss": None, "shared": None, "private": None}
+    return {
+        "rss": rollup.get("Rss", 0) * 1024,
+        "pss": rollup.get("Pss", 0) * 1024,
+        "shared": (rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0)) * 1024,
+        "private": (rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)) * 1024,
+    }
+
+
+def memory_report(pids: List[int]) -> dict:
+    """Per-process breakdown in MB plus totals (total PSS is the real footprint)"""
+    processes = {}
+    totals = {"rss": 0, "pss": 0, "private": 0}
+    for pid in pids:
+        breakdown = memory_breakdown(pid)
+        processes[pid] = {name: to_mb(value) if value is not None else None for name, value in breakdown.items()}
+        for name in totals:
+            totals[name] += breakdown[name] or 0
+    return {"processes": processes, "total_mb": {name: to_mb(value) for name, value in totals.items()}}
+
+
+def to_mb(value: int) -> float:
+    return round(value / (1024 * 1024), 1)
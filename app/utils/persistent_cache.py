@@ -0,0 +1,146 @@
+from typing import Any, Optional
+from utils.logger import get_logger
+from utils import config
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+import time
+
+logger = get_logger("persistent_cache")
+
+
+class PersistentCache:
+    """
+    Disk-backed key/value cache shared by every worker process on the host.
+
+    Backed by SQLite in WAL mode, so any number of processes can read while one
+    writes. Values are stored as JSON. Size is bounded by ``max_entries``; the
+    least recently read entries are evicted first. A read only records its
+    access time when the stored one is more than ``touch_interval`` seconds
+    old, so hot keys don't turn every read into a write competing for the
+    database's single writer lock. Connections are opened per thread and per
+    process, so the cache is safe to use after a fork.
+    """
+
+    _EVICT_EVERY = 100  # writes between eviction passes
+
+    def __init__(self, path: str, max_entries: int = 200000, touch_interval: float = 300.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._writes_since_evict = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, accessed_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+        except sqlite3.Error as e:
+            # A busy or broken cache must never fail the request
+            self.errors += 1
+            logger.warning("Persistent cache read failed", error=str(e))
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - row[1] >= self.touch_interval:
+            try:
+                conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            except sqlite3.Error as e:
+                # Only eviction order suffers; the value is still good
+                self.errors += 1
+                logger.debug("Persistent cache touch failed", error=str(e))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            self.writes += 1
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self._EVICT_EVERY:
+                self._writes_since_evict = 0
+                self._evict(conn)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Persistent cache write failed", error=str(e))
+
+    def _evict(self, conn: sqlite3.Connection):
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+            logger.debug("Persistent cache evicted entries", evicted=excess, max_entries=self.max_entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "max_entries": self.max_entries,
+            "touch_interval_seconds": self.touch_interval,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+_cache: Optional[PersistentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_persistent_cache() -> Optional[PersistentCache]:
+    """Process-wide cache instance, or None when disabled by config"""
+    global _cache
+    if not config.PERSISTENT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PersistentCache(config.PERSISTENT_CACHE_PATH, config.PERSISTENT_CACHE_MAX_ENTRIES,
+                                     config.PERSISTENT_CACHE_TOUCH_SECONDS)
+            logger.info("Persistent cache opened",
+                        path=config.PERSISTENT_CACHE_PATH,
+                        max_entries=config.PERSISTENT_CACHE_MAX_ENTRIES)
+        return _cache
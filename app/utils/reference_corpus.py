@@ -0,0 +1,24 @@
+# Fixed sentence set used to compare backends, quantisation and decoding modes.
+# Mix of sentences that need correcting and sentences that are already fine.
+REFERENCE_SENTENCES = [
+    "This sentence has error.",
+    "Here is another sentence with mistake.",
+    "She go to school every days.",
+    "They was happy about the results.",
+    "I has finished my homework yesterday.",
+    "The informations are not correct.",
+    "He don't like coffee in the morning.",
+    "We was waiting for the bus since an hour.",
+    "Their going to the park after lunch.",
+    "Me and him went to the store.",
+    "The childs are playing in the garden.",
+    "If I would have known, I would have came earlier.",
+    "The weather is nice today.",
+    "She has lived in Lisbon for ten years.",
+    "Please send me the report by Friday.",
+    "The committee approved the new budget last week.",
+    "Our team finished the project ahead of schedule.",
+    "Can you recommend a good book on history?",
+    "The results were better than we expected.",
+    "He quickly realised that the plan would not work.",
+]
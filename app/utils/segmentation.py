@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional
+from utils.logger import get_logger
+import threading
+
+logger = get_logger("segmentation")
+
+
+class SentenceSpan(NamedTuple):
+    start: int  # Offset of the first character in the segmented text
+    end: int  # Offset just past the last character
+    text: str  # text[start:end]
+
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+# Per-request memo of text -> spans; None outside a segmentation_scope()
+_request_spans: ContextVar[Optional[Dict[str, List[SentenceSpan]]]] = ContextVar("request_spans", default=None)
+
+
+def _legacy_punkt(error: Exception):
+    """Tokenizer from the pre-3.8.2 punkt pickle, or an untrained Punkt tokenizer as a last resort"""
+    import nltk
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+    try:
+        return nltk.data.load("tokenizers/punkt/english.pickle")
+    except Exception as e:
+        # Newer NLTK may refuse the pickle; untrained Punkt still splits, with less accurate boundaries
+        logger.warning("Punkt parameters unavailable, using an untrained sentence tokenizer",
+                       punkt_tab_error=str(error), punkt_error=str(e))
+        return PunktSentenceTokenizer()
+
+
+def get_sentence_tokenizer():
+    """The English Punkt tokenizer, loaded once per process (the data must be available, see models/registry.py)"""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                try:
+                    # NLTK >= 3.8.2 ships the parameters as punkt_tab
+                    from nltk.tokenize.punkt import PunktTokenizer
+                    _tokenizer = PunktTokenizer("english")
+                except (ImportError, LookupError) as e:
+                    _tokenizer = _legacy_punkt(e)
+                logger.info("Sentence tokenizer loaded", tokenizer=type(_tokenizer).__name__)
+    return _tokenizer
+
+
+@contextmanager
+def segmentation_scope():
+    """
+    Memoize sentence_spans() for the duration of the block.
+
+    Opened once per HTTP request; code running on the executor pools sees the
+    same memo because run_in_*_pool() copies the caller's context.
+    """
+    token = _request_spans.set({})
+    try:
+        yield
+    finally:
+        _request_spans.reset(token)
+
+
+def sentence_spans(text: str) -> List[SentenceSpan]:
+    """Sentences of ``text`` with their character offsets (same boundaries as nltk.sent_tokenize)"""
+    memo = _request_spans.get()
+    if memo is not None:
+        spans = memo.get(text)
+        if spans is not None:
+            return spans
+
+    spans = [SentenceSpan(start, end, text[start:end])
+             for start, end in get_sentence_tokenizer().span_tokenize(text)]
+    if memo is not None:
+        memo[text] = spans
+    return spans
+
+
+def split_into_sentences(text: str) -> List[str]:
+    return [span.text for span in sentence_spans(text)]
@@ -0,0 +1,64 @@
+from typing import Any, Awaitable, Callable, Dict
+from utils.logger import get_logger
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async calls into one execution.
+
+    The first caller for a key starts the computation as a task; callers that
+    arrive with the same key while it is running await that same task. The
+    task is shielded, so a disconnecting caller never cancels the work the
+    others are waiting on.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.logger = get_logger(f"single_flight.{name}")
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    def in_flight(self, key: str) -> bool:
+        """Whether do(key, ...) would join a running computation instead of starting one"""
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+            self.logger.debug("Joined in-flight request", waiters=self._waiters[key])
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "dedup_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self._inflight),
+            "current_waiters": sum(self._waiters.values()),
+            "max_waiters": self.max_waiters,
+        }
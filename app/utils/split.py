@@ -1,4 +0,0 @@
-import nltk
-
-def split_into_sentences(text: str):
-    return nltk.sent_tokenize(text)
\ No newline at end of file